@@ -1,10 +1,35 @@
 ﻿import json
-import boto3
+import asyncio
+import aioboto3
+import copy
+from aiobotocore.config import AioConfig
+from botocore.exceptions import ClientError, EventStreamError
 import logging
-import time
+import random
 import re
 import os
-from typing import Dict, Any, List, Optional
+import time
+from contextlib import AsyncExitStack
+from functools import lru_cache
+from typing import Dict, Any, AsyncIterator, List, Optional, Set, Tuple
+
+# Fast JSON for request/response bodies (falls back to the standard library)
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(obj: Any) -> bytes:
+        # Match orjson's output: raw UTF-8 and no whitespace
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    _json_loads = json.loads
+
+# Optional vector math for the semantic response cache
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
 
 # Robust logger setup with fallback
 try:
@@ -18,6 +43,224 @@ except ImportError:
     )
     logger = logging.getLogger(__name__)
 
+# Rule-based fallback keywords by category
+_RULE_KEYWORDS = {
+    'meeting': ('meeting', 'schedule', 'calendar', 'appointment', 'call', 'zoom', 'teams'),
+    'urgent': ('urgent', 'asap', 'immediately', 'critical', 'emergency', 'important'),
+    'task': ('task', 'todo', 'action item', 'follow up', 'deadline', 'deliverable'),
+    'complaint': ('complaint', 'issue', 'problem', 'not working', 'broken', 'error', 'bug'),
+    'inquiry': ('question', 'inquiry', 'asking', 'wondering', 'clarification', 'information')
+}
+
+# All categories in one case-insensitive pattern; the named group that matched
+# identifies the category. Whole words only (plural "s" allowed), so e.g.
+# "recall" no longer counts as "call".
+_RULE_CATEGORY_RE = re.compile(
+    "|".join(
+        rf"(?P<{category}>\b(?:{'|'.join(map(re.escape, keywords))})s?\b)"
+        for category, keywords in _RULE_KEYWORDS.items()
+    ),
+    re.IGNORECASE
+)
+_RULE_KEYWORD_SET = frozenset(keyword for keywords in _RULE_KEYWORDS.values() for keyword in keywords)
+
+# Enterprise system prompt shared by every request
+_BASE_SYSTEM_PROMPT = """
+        You are an enterprise AI email assistant designed for professional organizations. Your responsibilities include:
+
+        1. ANALYZE email content to determine if a response is needed
+        2. CLASSIFY emails by type, priority, and category with enterprise standards
+        3. GENERATE appropriate responses when needed with enterprise tone
+        4. SCHEDULE meetings when requested with enterprise validation
+        5. CREATE tasks for follow-up actions with enterprise metadata
+
+        ENTERPRISE RULES:
+        - When calling tools, you MUST provide ALL required arguments
+        - Validate your tool calls before executing them
+        - If unsure about any argument, ask for clarification rather than guessing
+        - Always provide meaningful summaries and descriptions
+        - Use appropriate enterprise tone and urgency levels
+        - Maintain professional standards throughout
+
+        Available enterprise tools:
+        - classify_email: Requires email_type, priority, category
+        - generate_draft: Requires tone, summary, urgency, response_type  
+        - schedule_meeting: Requires date, time, duration, attendees, meeting_title
+        - create_task: Requires title, description, due_date, priority, assignee
+
+        If no response is needed, return: {"action": "skip", "reason": "brief explanation"}
+        """.strip()
+
+# Category bits for rule-based classification; type lookup by the low four bits
+# follows the precedence meeting > task > complaint > inquiry
+_CATEGORY_BITS = {'meeting': 1, 'task': 2, 'complaint': 4, 'inquiry': 8, 'urgent': 16}
+_TYPE_BITS = 0x0F
+_URGENT_BIT = _CATEGORY_BITS['urgent']
+_TYPE_BY_MASK = tuple(
+    "meeting_request" if mask & 1 else
+    "task_assignment" if mask & 2 else
+    "complaint" if mask & 4 else
+    "inquiry" if mask & 8 else
+    "other"
+    for mask in range(16)
+)
+_PRIORITY_BY_TYPE = {"complaint": "high"}
+
+# Prompt-cache breakpoint for the static request prefix (system prompt, tools)
+_CACHE_CONTROL = {"type": "ephemeral"}
+
+# Instructions prepended to a batched classification request
+_BATCH_INSTRUCTIONS = (
+    "Process each of the following {count} emails independently. They are given as a JSON "
+    "array of objects with an \"id\" and a \"body\". For every email, call the appropriate "
+    "tools and set email_id to that email's id in each tool call.\n\n"
+)
+
+# Input cap for the embedding model (roughly its token limit)
+_EMBED_MAX_CHARS = 20000
+
+# Upper bound for a single retry backoff (seconds)
+_RETRY_DELAY_CAP = 20
+# Retry budget spent per throttled retry
+_THROTTLE_RETRY_COST = 5
+
+# Bedrock error codes worth retrying; anything else fails immediately unless it's a 5xx
+_RETRYABLE_ERROR_CODES = frozenset({
+    'ThrottlingException',
+    'ModelTimeoutException',
+    'ModelNotReadyException',
+    'ServiceUnavailableException',
+    'InternalServerException'
+})
+
+def _is_retryable(error: ClientError) -> bool:
+    """
+    Decide whether a Bedrock client error can succeed on retry.
+    
+    Args:
+        error: Client error raised by Bedrock
+        
+    Returns:
+        True for throttling, timeouts and server-side failures
+    """
+    if error.response.get('Error', {}).get('Code') in _RETRYABLE_ERROR_CODES:
+        return True
+    return error.response.get('ResponseMetadata', {}).get('HTTPStatusCode', 0) >= 500
+
+# Fields every tool call must carry
+_REQUIRED_TOOL_FIELDS = ('name', 'input')
+
+def _fast_toolcall(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Extract a tool call from one response content block.
+    Handles both {'tool_use': {...}} and {'type': 'tool_use', ...} blocks.
+    
+    Args:
+        item: Response content block
+        
+    Returns:
+        Tool call with name and input, or None if the block isn't a valid tool call
+    """
+    tool_use = item.get('tool_use')
+    if tool_use is None:
+        if item.get('type') != 'tool_use':
+            return None
+        tool_use = item
+    name = tool_use.get('name')
+    tool_input = tool_use.get('input')
+    if name is None or not isinstance(tool_input, dict):
+        return None
+    return {'name': name, 'input': tool_input}
+
+class TokenBucket:
+    """
+    Client-side retry budget.
+    Tokens refill continuously up to capacity; retries are shed once the
+    bucket is empty so throttling doesn't get amplified by our own retries.
+    """
+    
+    def __init__(self, capacity: float = 500, refill_rate: float = 10):
+        self.capacity = capacity
+        self.refill_rate = refill_rate  # tokens per second
+        self._tokens = capacity
+        self._updated = time.monotonic()
+    
+    def try_acquire(self, cost: float = 1) -> bool:
+        """
+        Take tokens from the bucket if enough are available.
+        
+        Args:
+            cost: Number of tokens to take
+            
+        Returns:
+            True if the tokens were taken
+        """
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.refill_rate)
+        self._updated = now
+        if self._tokens < cost:
+            return False
+        self._tokens -= cost
+        return True
+
+class SemanticCache:
+    """
+    Response cache keyed by email embedding similarity.
+    Embeddings are stored normalized in one fp16 matrix, so a lookup is a single
+    matrix-vector product; the least recently used entry is evicted when full.
+    """
+    
+    def __init__(self, dimensions: int, maxsize: int = 1024, threshold: float = 0.9):
+        self.threshold = threshold
+        self._matrix = np.zeros((maxsize, dimensions), dtype=np.float16)
+        self._partitions = np.full(maxsize, -1, dtype=np.int64)
+        self._last_used = np.zeros(maxsize, dtype=np.int64)
+        self._responses: List[Optional[Dict[str, Any]]] = [None] * maxsize
+        self._size = 0
+        self._clock = 0
+    
+    def lookup(self, embedding: Any, partition: int) -> Optional[Dict[str, Any]]:
+        """
+        Find a cached response for a similar email.
+        
+        Args:
+            embedding: Normalized query embedding
+            partition: Key of the prompt/tools the response was produced with
+            
+        Returns:
+            Cached response, or None below the similarity threshold
+        """
+        if not self._size:
+            return None
+        scores = self._matrix[:self._size].astype(np.float32) @ embedding
+        scores[self._partitions[:self._size] != partition] = -1.0
+        best = int(scores.argmax())
+        if scores[best] < self.threshold:
+            return None
+        self._clock += 1
+        self._last_used[best] = self._clock
+        return self._responses[best]
+    
+    def store(self, embedding: Any, partition: int, response: Dict[str, Any]):
+        """
+        Cache a response, evicting the least recently used entry if full.
+        
+        Args:
+            embedding: Normalized embedding of the email
+            partition: Key of the prompt/tools the response was produced with
+            response: Model response to cache
+        """
+        if self._size < len(self._responses):
+            slot = self._size
+            self._size += 1
+        else:
+            slot = int(self._last_used.argmin())
+        self._clock += 1
+        self._matrix[slot] = embedding
+        self._partitions[slot] = partition
+        self._last_used[slot] = self._clock
+        self._responses[slot] = response
+
 class BedrockHandler:
     """
     Bedrock handler with multi-tier fallback strategy.
@@ -27,11 +270,35 @@ class BedrockHandler:
     2. Fallback 1: Claude 3 Haiku (faster, cheaper)
     3. Fallback 2: Rule-based classification (no AI)
     
-    Includes retry logic, exponential backoff, and comprehensive error handling.
+    Includes retry logic, jittered backoff with a retry budget, and comprehensive error handling.
+    Model calls are coroutines on an aioboto3 client, so independent invocations
+    can be awaited concurrently (e.g. with asyncio.gather) instead of blocking.
     """
     
     def __init__(self):
-        self.bedrock_client = boto3.client('bedrock-runtime', region_name='us-east-1')
+        self.region_name = 'us-east-1'
+        # Regions tried in order when the current one throttles. Failover is opt-in:
+        # email content only leaves the primary region if BEDROCK_REGIONS lists
+        # others (and the Lambda role must be granted Bedrock access there too)
+        self.regions = [r.strip() for r in os.environ.get(
+            'BEDROCK_REGIONS', self.region_name).split(',') if r.strip()]
+        if self.region_name not in self.regions:
+            self.regions.insert(0, self.region_name)
+        self._region_cooldown: Dict[str, float] = {}
+        self._session = aioboto3.Session()
+        # One pooled keep-alive client is reused for every call; botocore's own
+        # retries are off so they don't multiply with _invoke_with_retry
+        self._client_config = AioConfig(
+            max_pool_connections=50,
+            retries={'max_attempts': 1, 'mode': 'standard'},
+            tcp_keepalive=True,
+            connect_timeout=3,
+            read_timeout=int(os.environ.get('BEDROCK_READ_TIMEOUT', '30'))
+        )
+        self._clients: Dict[str, Any] = {}
+        self._client_stack = AsyncExitStack()
+        self._client_lock: Optional[asyncio.Lock] = None
+        self._tools_blobs: Dict[int, Tuple[List[Dict[str, Any]], bytes]] = {}
         
         # Model hierarchy: Primary -> Fallback
         # Allow environment variable override for flexibility
@@ -41,11 +308,85 @@ class BedrockHandler:
         }
         
         self.current_model = self.models['primary']
+        self._default_system_prompt = self.create_system_prompt("")
+        # Answer confidently rule-classifiable emails without calling a model (opt-in;
+        # only for classification-only requests, the rules can't draft or schedule)
+        self.rule_fast_path = os.environ.get('BEDROCK_RULE_FAST_PATH', 'false').lower() == 'true'
+        
+        # Semantic cache for near-duplicate emails (requires numpy). Opt-in: every miss
+        # costs an embedding call, and the Lambda role needs access to the embedding
+        # model. Only classification-only requests use it, so another email's drafts,
+        # meetings or tasks are never replayed.
+        self.embedding_model = os.environ.get('BEDROCK_EMBEDDING_MODEL', 'amazon.titan-embed-text-v2:0')
+        self.embedding_dimensions = 256
+        self._semantic_cache = None
+        if NUMPY_AVAILABLE and os.environ.get('BEDROCK_SEMANTIC_CACHE', 'false').lower() == 'true':
+            self._semantic_cache = SemanticCache(
+                self.embedding_dimensions,
+                maxsize=int(os.environ.get('BEDROCK_SEMANTIC_CACHE_SIZE', '1024')),
+                threshold=float(os.environ.get('BEDROCK_SEMANTIC_CACHE_THRESHOLD', '0.9'))
+            )
         self.max_retries = int(os.environ.get('BEDROCK_MAX_RETRIES', '3'))
         self.retry_delay = int(os.environ.get('BEDROCK_RETRY_DELAY', '1'))  # seconds
+        self._retry_tokens = TokenBucket(capacity=500, refill_rate=10)
+        # Start the fallback model if the primary hasn't answered within this window.
+        # Off by default: a hedge doubles spend and may downgrade the answer to the
+        # fallback model, so set it from the primary's measured p95 latency.
+        hedge_ms = int(os.environ.get('BEDROCK_HEDGE_MS', '0'))
+        self.hedge_delay: Optional[float] = hedge_ms / 1000 if hedge_ms > 0 else None
+    
+    def client_factory(self, region: Optional[str] = None):
+        """Return an async Bedrock runtime client context manager."""
+        return self._session.client('bedrock-runtime', region_name=region or self.region_name,
+                                    config=self._client_config)
+    
+    async def _get_client(self, region: Optional[str] = None):
+        """
+        Return the shared Bedrock client for a region, opening it on first use.
+        
+        Args:
+            region: AWS region (defaults to the primary region)
+            
+        Returns:
+            Open async Bedrock runtime client
+        """
+        region = region or self.region_name
+        client = self._clients.get(region)
+        if client is None:
+            if self._client_lock is None:
+                self._client_lock = asyncio.Lock()
+            async with self._client_lock:
+                client = self._clients.get(region)
+                if client is None:
+                    client = await self._client_stack.enter_async_context(self.client_factory(region))
+                    self._clients[region] = client
+        return client
+    
+    async def close(self):
+        """Close the shared Bedrock clients and their connection pools."""
+        await self._client_stack.aclose()
+        self._clients = {}
+        self._client_stack = AsyncExitStack()
+    
+    def _pick_region(self) -> str:
+        """
+        Choose a region that isn't cooling down after throttling.
+        The primary region is preferred while healthy.
+        
+        Returns:
+            Region name
+        """
+        now = time.monotonic()
+        healthy = [r for r in self.regions if self._region_cooldown.get(r, 0) <= now]
+        if not healthy:
+            return min(self.regions, key=lambda r: self._region_cooldown.get(r, 0))
+        if healthy[0] == self.region_name:
+            return healthy[0]
+        return random.choice(healthy)
         
-    def invoke_model_with_tools(self, messages: List[Dict[str, str]], tools: List[Dict[str, Any]], 
-                               max_tokens: int = 4000, temperature: float = 0.1) -> Dict[str, Any]:
+    async def invoke_model_with_tools(self, messages: List[Dict[str, str]], tools: List[Dict[str, Any]], 
+                               max_tokens: int = 4000, temperature: float = 0.1,
+                               system: Optional[str] = None) -> Dict[str, Any]:
         """
         Invoke Claude model with enterprise tool calling support and fallback logic.
         
@@ -54,35 +395,364 @@ class BedrockHandler:
             tools: List of available tools with enterprise schemas
             max_tokens: Maximum tokens to generate
             temperature: Sampling temperature
+            system: System prompt; system-role entries in messages are used if omitted
             
         Returns:
             Model response with enterprise metadata
         """
-        # Try primary model with retries
-        response = self._invoke_with_retry(
-            messages, tools, max_tokens, temperature, self.models['primary']
-        )
+        system_blocks, messages = self._split_system_prompt(messages, system)
         
-        if response:
-            return response
+        # Fail early: skip the model entirely when only a classification was asked
+        # for and the rules are already confident
+        if self.rule_fast_path and self._classification_only(tools):
+            shortcut = self._should_skip_llm(self._user_message_content(messages))
+            if shortcut:
+                logger.info(f"Rule-based classification is confident, skipping model call: {shortcut}")
+                return self._rule_based_fallback(messages, fallback_mode='rule_based_confident')
         
-        # Fallback to Haiku model
-        logger.warning("Primary model failed, falling back to Claude Haiku")
-        response = self._invoke_with_retry(
-            messages, tools, max_tokens, temperature, self.models['fallback']
-        )
+        # Near-duplicate of an email already answered with the same prompt and tools
+        embedding = partition = None
+        if self._semantic_cache is not None and self._classification_only(tools):
+            embedding = await self._embed(self._user_message_content(messages))
+            if embedding is not None:
+                partition = hash((json.dumps(system_blocks, sort_keys=True),
+                                  tuple(tool.get('name') for tool in tools)))
+                cached = self._semantic_cache.lookup(embedding, partition)
+                if cached is not None:
+                    logger.info("Semantic cache hit, skipping model call")
+                    return {**copy.deepcopy(cached), 'cache_hit': True}
         
-        if response:
-            return response
+        primary_id = self.models['primary']
+        fallback_id = self.models['fallback']
+        
+        # Try primary model with retries; hedge with Haiku if it is slow (when enabled)
+        primary_task = asyncio.create_task(self._invoke_with_retry(
+            messages, tools, max_tokens, temperature, primary_id, system_blocks
+        ))
+        await asyncio.wait({primary_task}, timeout=self.hedge_delay)
+        
+        if primary_task.done():
+            response = primary_task.result()
+            if response:
+                self.current_model = response['model_used'] = primary_id
+                self._cache_response(embedding, partition, response)
+                return response
+            logger.warning("Primary model failed, falling back to Claude Haiku")
+            tasks = {}
+        else:
+            logger.info(f"Primary model slower than {self.hedge_delay}s, hedging with Claude Haiku")
+            tasks = {primary_task: primary_id}
+        
+        fallback_task = asyncio.create_task(self._invoke_with_retry(
+            messages, tools, max_tokens, temperature, fallback_id, system_blocks
+        ))
+        tasks[fallback_task] = fallback_id
+        
+        # First successful model wins; the other request is cancelled
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            # Prefer the primary if both finished together
+            for task in sorted(done, key=lambda t: tasks[t] != primary_id):
+                response = task.result()
+                if response:
+                    for other in pending:
+                        other.cancel()
+                    self.current_model = response['model_used'] = tasks[task]
+                    logger.info(f"Response served by {self.current_model}")
+                    self._cache_response(embedding, partition, response)
+                    return response
         
         # Final fallback: Rule-based classification
         logger.error("All AI models failed, using rule-based fallback")
         return self._rule_based_fallback(messages)
     
-    def _invoke_with_retry(self, messages: List[Dict[str, str]], tools: List[Dict[str, Any]], 
-                          max_tokens: int, temperature: float, model_id: str) -> Optional[Dict[str, Any]]:
+    async def invoke_model_with_tools_batch(self, message_lists: List[List[Dict[str, str]]],
+                                            tools: List[Dict[str, Any]], max_tokens: int = 4000,
+                                            temperature: float = 0.1,
+                                            system: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Classify several emails with a single model invocation.
+        Emails the batch response doesn't cover are retried through the
+        single-email path.
+        
+        Args:
+            message_lists: One message list per email
+            tools: List of available tools with enterprise schemas
+            max_tokens: Maximum tokens to generate for the whole batch
+            temperature: Sampling temperature
+            system: System prompt shared by every email
+            
+        Returns:
+            One model response per email, in input order
+        """
+        if len(message_lists) == 1:
+            return [await self.invoke_model_with_tools(message_lists[0], tools, max_tokens, temperature, system)]
+        
+        system_blocks, _ = self._split_system_prompt(message_lists[0], system)
+        items = [{"id": i, "body": self._user_message_content(messages)}
+                 for i, messages in enumerate(message_lists)]
+        batch_messages = [{
+            "role": "user",
+            "content": _BATCH_INSTRUCTIONS.format(count=len(items)) + json.dumps(items)
+        }]
+        batch_tools = [self._with_email_id(tool) for tool in tools]
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(message_lists)
+        response = await self._invoke_with_retry(
+            batch_messages, batch_tools, max_tokens, temperature, self.models['primary'], system_blocks
+        )
+        if response:
+            for email_id, blocks in self.extract_batch_tool_calls(response).items():
+                if 0 <= email_id < len(results):
+                    results[email_id] = {
+                        'content': blocks,
+                        'stop_reason': response.get('stop_reason'),
+                        'batch_size': len(results)
+                    }
+        
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            logger.warning(f"Batch response missing {len(missing)}/{len(results)} emails, invoking individually")
+            singles = await asyncio.gather(*(
+                self.invoke_model_with_tools(message_lists[i], tools, max_tokens, temperature, system)
+                for i in missing
+            ))
+            for i, single in zip(missing, singles):
+                results[i] = single
+        
+        return results
+    
+    async def invoke_model_stream(self, messages: List[Dict[str, str]], tools: List[Dict[str, Any]],
+                                  max_tokens: int = 4000, temperature: float = 0.1,
+                                  system: Optional[str] = None,
+                                  model_id: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream a tool-calling response so tool calls can be handled before generation ends.
+        Falls back to invoke_model_with_tools if the stream fails before producing output.
+        
+        Args:
+            messages: List of message objects with role and content
+            tools: List of available tools with enterprise schemas
+            max_tokens: Maximum tokens to generate
+            temperature: Sampling temperature
+            system: System prompt; system-role entries in messages are used if omitted
+            model_id: Model identifier (defaults to the primary model)
+            
+        Yields:
+            {'type': 'text', 'text': ...} deltas and completed
+            {'type': 'tool_use', 'id': ..., 'name': ..., 'input': ...} blocks
+        """
+        model_id = model_id or self.models['primary']
+        system_blocks, chat_messages = self._split_system_prompt(messages, system)
+        request_body = self._request_body(chat_messages, tools, max_tokens, temperature, system_blocks)
+        
+        client = await self._get_client()
+        emitted = False
+        try:
+            response = await client.invoke_model_with_response_stream(
+                modelId=model_id,
+                body=request_body,
+                contentType="application/json"
+            )
+            
+            # Tool input arrives as partial JSON; accumulate it per content block
+            tool_blocks: Dict[int, Dict[str, Any]] = {}
+            async for event in response['body']:
+                chunk = event.get('chunk')
+                if not chunk:
+                    continue
+                data = _json_loads(chunk['bytes'])
+                event_type = data.get('type')
+                
+                if event_type == 'content_block_start':
+                    block = data.get('content_block', {})
+                    if block.get('type') == 'tool_use':
+                        tool_blocks[data['index']] = {'id': block.get('id'), 'name': block.get('name'), 'json': []}
+                
+                elif event_type == 'content_block_delta':
+                    delta = data.get('delta', {})
+                    if delta.get('type') == 'input_json_delta':
+                        tool_blocks[data['index']]['json'].append(delta.get('partial_json', ''))
+                    elif delta.get('type') == 'text_delta':
+                        emitted = True
+                        yield {'type': 'text', 'text': delta.get('text', '')}
+                
+                elif event_type == 'content_block_stop' and data.get('index') in tool_blocks:
+                    block = tool_blocks.pop(data['index'])
+                    raw_input = ''.join(block['json'])
+                    emitted = True
+                    yield {
+                        'type': 'tool_use',
+                        'id': block['id'],
+                        'name': block['name'],
+                        'input': _json_loads(raw_input) if raw_input else {}
+                    }
+            
+            logger.info(f"✓ Model {model_id} stream completed")
+            
+        except (client.exceptions.ModelStreamErrorException, EventStreamError) as e:
+            if emitted:
+                logger.error(f"Model stream failed mid-response: {str(e)}")
+                return
+            logger.warning(f"Model stream failed, using non-streaming invocation: {str(e)}")
+            response = await self.invoke_model_with_tools(messages, tools, max_tokens, temperature, system)
+            for item in response.get('content', []):
+                yield item
+    
+    def _with_email_id(self, tool: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Add a required email_id argument to a tool schema for batched requests.
+        
+        Args:
+            tool: Tool definition (left unmodified)
+            
+        Returns:
+            Tool definition with email_id
+        """
+        schema = tool.get('input_schema', {})
+        return {
+            **tool,
+            'input_schema': {
+                **schema,
+                'properties': {
+                    'email_id': {"type": "integer", "description": "id of the email this call is for"},
+                    **schema.get('properties', {})
+                },
+                'required': ['email_id', *schema.get('required', [])]
+            }
+        }
+    
+    async def _embed(self, text: str) -> Optional[Any]:
+        """
+        Embed email text for the semantic cache.
+        
+        Args:
+            text: Email text
+            
+        Returns:
+            Normalized float32 embedding, or None if embedding failed
+        """
+        if not text:
+            return None
+        try:
+            client = await self._get_client()
+            response = await client.invoke_model(
+                modelId=self.embedding_model,
+                body=_json_dumps({
+                    "inputText": text[:_EMBED_MAX_CHARS],
+                    "dimensions": self.embedding_dimensions,
+                    "normalize": True
+                }),
+                contentType="application/json"
+            )
+            vector = np.asarray(_json_loads(await response['body'].read())['embedding'], dtype=np.float32)
+            norm = np.linalg.norm(vector)
+            return vector / norm if norm else None
+        except Exception as e:
+            logger.warning(f"Embedding failed, bypassing semantic cache: {str(e)}")
+            return None
+    
+    def _cache_response(self, embedding: Optional[Any], partition: Optional[int],
+                        response: Dict[str, Any]):
+        """Store a classification-only model response in the semantic cache when an embedding is available."""
+        if embedding is None or self._semantic_cache is None:
+            return
+        if all(block.get('name') == 'classify_email'
+               for block in response.get('content', []) if block.get('type') == 'tool_use'):
+            # Copied so the caller's later changes to its response don't reach the cache
+            self._semantic_cache.store(embedding, partition, copy.deepcopy(response))
+    
+    def _split_system_prompt(self, messages: List[Dict[str, str]],
+                             system: Optional[str]) -> Tuple[List[Dict[str, Any]], List[Dict[str, str]]]:
+        """
+        Move the system prompt into a cacheable top-level system block.
+        
+        Args:
+            messages: Message list, possibly containing system-role entries
+            system: Explicit system prompt, if any
+            
+        Returns:
+            Tuple of (system blocks, messages without system-role entries)
+        """
+        if system is None:
+            system = "\n\n".join(m.get('content', '') for m in messages if m.get('role') == 'system')
+        messages = [m for m in messages if m.get('role') != 'system']
+        
+        if not system:
+            return [], messages
+        return [{"type": "text", "text": system, "cache_control": _CACHE_CONTROL}], messages
+    
+    def _with_cache_breakpoint(self, tools: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Mark the last tool definition as a cache breakpoint.
+        
+        Args:
+            tools: Tool definitions (left unmodified)
+            
+        Returns:
+            Tool definitions with cache_control on the final entry
+        """
+        if not tools:
+            return tools
+        return [*tools[:-1], {**tools[-1], "cache_control": _CACHE_CONTROL}]
+    
+    def _tools_blob(self, tools: List[Dict[str, Any]]) -> bytes:
+        """
+        Serialize tool definitions (with the cache breakpoint) once per tools list.
+        Lists are cached by identity, so callers should not mutate a list after use.
+        
+        Args:
+            tools: Tool definitions
+            
+        Returns:
+            JSON bytes for the tools field
+        """
+        cached = self._tools_blobs.get(id(tools))
+        if cached is not None and cached[0] is tools:
+            return cached[1]
+        blob = _json_dumps(self._with_cache_breakpoint(tools))
+        if len(self._tools_blobs) >= 32:
+            self._tools_blobs.clear()
+        # Holding the list keeps its id from being reused while cached
+        self._tools_blobs[id(tools)] = (tools, blob)
+        return blob
+    
+    def _request_body(self, messages: List[Dict[str, str]], tools: List[Dict[str, Any]],
+                      max_tokens: int, temperature: float,
+                      system: Optional[List[Dict[str, Any]]] = None) -> bytes:
+        """
+        Build a serialized tool-calling request body.
+        Only the messages and scalar fields are encoded per call; the tools
+        schema is spliced in from its cached serialization.
+        
+        Args:
+            messages: Message list
+            tools: Tool definitions
+            max_tokens: Token limit
+            temperature: Sampling temperature
+            system: System content blocks
+            
+        Returns:
+            JSON request body
+        """
+        params = {
+            "tool_choice": "auto",
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "anthropic_version": "bedrock-2023-05-31"
+        }
+        if system:
+            params["system"] = system
+        return (b'{"messages":' + _json_dumps(messages)
+                + b',"tools":' + self._tools_blob(tools)
+                + b',' + _json_dumps(params)[1:])
+    
+    async def _invoke_with_retry(self, messages: List[Dict[str, str]], tools: List[Dict[str, Any]], 
+                          max_tokens: int, temperature: float, model_id: str,
+                          system: Optional[List[Dict[str, Any]]] = None) -> Optional[Dict[str, Any]]:
         """
-        Invoke model with retry logic and exponential backoff.
+        Invoke model with retry logic and decorrelated-jitter backoff.
         
         Args:
             messages: Message list
@@ -90,89 +760,161 @@ class BedrockHandler:
             max_tokens: Token limit
             temperature: Sampling temperature
             model_id: Model identifier
+            system: System content blocks
             
         Returns:
             Model response or None if all retries fail
         """
+        # Request body is identical for every attempt
+        request_body = self._request_body(messages, tools, max_tokens, temperature, system)
+        
+        prev_delay = self.retry_delay
         for attempt in range(self.max_retries):
+            region = self._pick_region()
+            client = await self._get_client(region)
             try:
-                logger.info(f"Attempt {attempt + 1}/{self.max_retries} with model: {model_id}")
-                
-                # Prepare request body
-                request_body = {
-                    "messages": messages,
-                    "tools": tools,
-                    "tool_choice": "auto",
-                    "max_tokens": max_tokens,
-                    "temperature": temperature,
-                    "anthropic_version": "bedrock-2023-05-31"
-                }
-                
+                logger.info(f"Attempt {attempt + 1}/{self.max_retries} with model: {model_id} in {region}")
+            
                 # Invoke model
-                response = self.bedrock_client.invoke_model(
+                response = await client.invoke_model(
                     modelId=model_id,
-                    body=json.dumps(request_body),
+                    body=request_body,
                     contentType="application/json"
                 )
-                
+            
                 # Parse response
-                response_body = json.loads(response['body'].read())
-                
-                logger.info(f"✓ Model {model_id} responded successfully")
+                response_body = _json_loads(await response['body'].read())
+            
+                usage = response_body.get('usage', {})
+                logger.info(f"✓ Model {model_id} responded successfully "
+                            f"(cache read: {usage.get('cache_read_input_tokens', 0)}, "
+                            f"cache write: {usage.get('cache_creation_input_tokens', 0)} tokens)")
                 return response_body
-                
-            except self.bedrock_client.exceptions.ModelNotReadyException as e:
+            
+            except client.exceptions.ModelNotReadyException as e:
                 logger.warning(f"Model not ready: {str(e)}")
                 if attempt < self.max_retries - 1:
-                    delay = self.retry_delay * (2 ** attempt)  # Exponential backoff
-                    logger.info(f"Retrying in {delay} seconds...")
-                    time.sleep(delay)
-                    
-            except self.bedrock_client.exceptions.ThrottlingException as e:
+                    delay = prev_delay = self._next_delay(prev_delay)
+                    logger.info(f"Retrying in {delay:.2f} seconds...")
+                    await asyncio.sleep(delay)
+                
+            except client.exceptions.ThrottlingException as e:
                 logger.warning(f"Throttling detected: {str(e)}")
                 if attempt < self.max_retries - 1:
-                    delay = self.retry_delay * (2 ** attempt)
-                    logger.info(f"Backing off for {delay} seconds...")
-                    time.sleep(delay)
-                    
-            except self.bedrock_client.exceptions.ModelTimeoutException as e:
+                    # Fail fast instead of adding load while the retry budget is exhausted
+                    if not self._retry_tokens.try_acquire(_THROTTLE_RETRY_COST):
+                        logger.warning("Retry budget exhausted, not retrying throttled request")
+                        return None
+                    delay = prev_delay = self._next_delay(prev_delay)
+                    # Let the throttled region drain; retry elsewhere right away if possible
+                    self._region_cooldown[region] = time.monotonic() + delay
+                    if self._region_cooldown.get(self._pick_region(), 0) <= time.monotonic():
+                        logger.info(f"Region {region} throttled, failing over")
+                        continue
+                    logger.info(f"Backing off for {delay:.2f} seconds...")
+                    await asyncio.sleep(delay)
+                
+            except client.exceptions.ModelTimeoutException as e:
                 logger.warning(f"Model timeout: {str(e)}")
                 if attempt < self.max_retries - 1:
                     logger.info(f"Retrying with shorter timeout...")
-                    time.sleep(self.retry_delay)
-                    
-            except self.bedrock_client.exceptions.AccessDeniedException as e:
+                    await asyncio.sleep(self.retry_delay)
+                
+            except client.exceptions.AccessDeniedException as e:
                 logger.error(f"Access denied to model {model_id}: {str(e)}")
                 logger.error("Check Bedrock model access permissions in AWS console")
                 return None  # No point retrying access denied
-                
+            
+            except ClientError as e:
+                # Validation, payload-too-large, 4xx model errors etc. will never succeed
+                if not _is_retryable(e):
+                    logger.error(f"Non-retryable error from model {model_id}: {str(e)}")
+                    return None
+                logger.warning(f"Service error: {str(e)}")
+                if attempt < self.max_retries - 1:
+                    delay = prev_delay = self._next_delay(prev_delay)
+                    logger.info(f"Retrying in {delay:.2f} seconds...")
+                    await asyncio.sleep(delay)
+            
             except Exception as e:
                 logger.error(f"Unexpected error invoking model: {str(e)}")
                 if attempt < self.max_retries - 1:
-                    time.sleep(self.retry_delay)
-        
+                    await asyncio.sleep(self.retry_delay)
+    
         logger.error(f"All {self.max_retries} attempts failed for model {model_id}")
         return None
     
-    def _rule_based_fallback(self, messages: List[Dict[str, str]]) -> Dict[str, Any]:
+    def _next_delay(self, prev_delay: float) -> float:
+        """
+        Decorrelated-jitter backoff so concurrent callers don't retry in lockstep.
+        
+        Args:
+            prev_delay: Previous delay in seconds
+            
+        Returns:
+            Next delay in seconds
+        """
+        return min(_RETRY_DELAY_CAP, random.uniform(self.retry_delay, prev_delay * 3))
+    
+    def _user_message_content(self, messages: List[Dict[str, str]]) -> str:
+        """
+        Get the email content from the latest user message.
+        
+        Args:
+            messages: Message list containing email content
+            
+        Returns:
+            User message content, or an empty string
+        """
+        # The email is normally the last message, so search from the end
+        return next((msg.get('content', '') for msg in reversed(messages) if msg.get('role') == 'user'), "")
+    
+    def _classification_only(self, tools: List[Dict[str, Any]]) -> bool:
+        """True if classify_email is the only tool the model may call."""
+        return bool(tools) and all(tool.get('name') == 'classify_email' for tool in tools)
+    
+    def _should_skip_llm(self, email_content: str) -> Optional[Dict[str, Any]]:
+        """
+        Decide whether rule-based classification is confident enough to skip the model.
+        Confident means two distinct keywords from one email-type category (a
+        plural counts as its singular), or a short email with an urgency keyword.
+        
+        Args:
+            email_content: Email text
+            
+        Returns:
+            Matched keywords by category when confident, otherwise None
+        """
+        matched: Dict[str, Set[str]] = {}
+        for match in _RULE_CATEGORY_RE.finditer(email_content):
+            word = match.group().lower()
+            if word not in _RULE_KEYWORD_SET:
+                word = word[:-1]  # plural "s"
+            matched.setdefault(match.lastgroup, set()).add(word)
+        
+        if any(len(words) >= 2 for category, words in matched.items() if category != 'urgent'):
+            return matched
+        if len(email_content) < 100 and 'urgent' in matched:
+            return matched
+        return None
+    
+    def _rule_based_fallback(self, messages: List[Dict[str, str]],
+                             fallback_mode: str = 'rule_based') -> Dict[str, Any]:
         """
         Rule-based email classification when AI models are unavailable.
         Uses keyword matching and heuristics.
         
         Args:
             messages: Message list containing email content
+            fallback_mode: Reported reason for the rule-based answer
             
         Returns:
             Simulated model response with classification
         """
         logger.info("Using rule-based fallback classification")
         
-        # Extract email content
-        email_content = ""
-        for msg in messages:
-            if msg.get('role') == 'user':
-                email_content = msg.get('content', '').lower()
-                break
+        # Extract email content (the keyword scan is case-insensitive, no copy needed)
+        email_content = self._user_message_content(messages)
         
         # Rule-based classification
         classification = self._classify_by_rules(email_content)
@@ -187,7 +929,7 @@ class BedrockHandler:
                     'input': classification
                 }
             ],
-            'fallback_mode': 'rule_based',
+            'fallback_mode': fallback_mode,
             'stop_reason': 'end_turn',
             'usage': {
                 'input_tokens': 0,
@@ -200,45 +942,24 @@ class BedrockHandler:
         Classify email using keyword-based rules.
         
         Args:
-            email_content: Email text (lowercase)
+            email_content: Email text (any case)
             
         Returns:
             Classification dictionary
         """
-        # Meeting keywords
-        meeting_keywords = ['meeting', 'schedule', 'calendar', 'appointment', 'call', 'zoom', 'teams']
-        
-        # Urgency keywords
-        urgent_keywords = ['urgent', 'asap', 'immediately', 'critical', 'emergency', 'important']
-        
-        # Task keywords
-        task_keywords = ['task', 'todo', 'action item', 'follow up', 'deadline', 'deliverable']
-        
-        # Complaint keywords
-        complaint_keywords = ['complaint', 'issue', 'problem', 'not working', 'broken', 'error', 'bug']
-        
-        # Inquiry keywords
-        inquiry_keywords = ['question', 'inquiry', 'asking', 'wondering', 'clarification', 'information']
+        # One scan for every keyword category
+        mask = self._match_rule_mask(email_content)
         
-        # Determine email type
-        email_type = "other"
-        if any(keyword in email_content for keyword in meeting_keywords):
-            email_type = "meeting_request"
-        elif any(keyword in email_content for keyword in task_keywords):
-            email_type = "task_assignment"
-        elif any(keyword in email_content for keyword in complaint_keywords):
-            email_type = "complaint"
-        elif any(keyword in email_content for keyword in inquiry_keywords):
-            email_type = "inquiry"
+        # Determine email type (precedence is baked into the lookup table)
+        email_type = _TYPE_BY_MASK[mask & _TYPE_BITS]
         
         # Determine priority
-        priority = "medium"
-        if any(keyword in email_content for keyword in urgent_keywords):
+        if mask & _URGENT_BIT:
             priority = "urgent"
         elif len(email_content) < 100:
             priority = "low"
-        elif email_type == "complaint":
-            priority = "high"
+        else:
+            priority = _PRIORITY_BY_TYPE.get(email_type, "medium")
         
         # Generate category
         category = f"Rule-based classification: {email_type}"
@@ -251,7 +972,22 @@ class BedrockHandler:
             "category": category
         }
     
-    def invoke_model_simple(self, prompt: str, max_tokens: int = 1000, 
+    def _match_rule_mask(self, email_content: str) -> int:
+        """
+        Find which keyword categories occur in the email.
+        
+        Args:
+            email_content: Email text (any case)
+            
+        Returns:
+            Bitmask of matched categories
+        """
+        mask = 0
+        for match in _RULE_CATEGORY_RE.finditer(email_content):
+            mask |= _CATEGORY_BITS[match.lastgroup]
+        return mask
+    
+    async def invoke_model_simple(self, prompt: str, max_tokens: int = 1000, 
                            temperature: float = 0.1) -> str:
         """
         Simple model invocation with fallback support.
@@ -267,22 +1003,24 @@ class BedrockHandler:
         messages = [{"role": "user", "content": prompt}]
         
         # Try primary model
-        result = self._simple_invoke_with_retry(messages, max_tokens, temperature, self.models['primary'])
+        result = await self._simple_invoke_with_retry(messages, max_tokens, temperature, self.models['primary'])
         if result:
             return result
         
         # Try fallback model
         logger.warning("Primary model failed, using Haiku for simple invocation")
-        result = self._simple_invoke_with_retry(messages, max_tokens, temperature, self.models['fallback'])
+        result = await self._simple_invoke_with_retry(messages, max_tokens, temperature, self.models['fallback'])
         if result:
             return result
         
         # Final fallback
         return "AI models unavailable. Please try again later or contact support."
     
-    def _simple_invoke_with_retry(self, messages: List[Dict[str, str]], max_tokens: int, 
+    async def _simple_invoke_with_retry(self, messages: List[Dict[str, str]], max_tokens: int, 
                                   temperature: float, model_id: str) -> Optional[str]:
         """Simple invocation with retry logic."""
+        prev_delay = self.retry_delay
+        client = await self._get_client()
         for attempt in range(self.max_retries):
             try:
                 request_body = {
@@ -291,24 +1029,27 @@ class BedrockHandler:
                     "temperature": temperature,
                     "anthropic_version": "bedrock-2023-05-31"
                 }
-                
-                response = self.bedrock_client.invoke_model(
+            
+                response = await client.invoke_model(
                     modelId=model_id,
-                    body=json.dumps(request_body),
+                    body=_json_dumps(request_body),
                     contentType="application/json"
                 )
-                
-                response_body = json.loads(response['body'].read())
+            
+                response_body = _json_loads(await response['body'].read())
                 content = response_body.get('content', [])
-                
+            
                 if content and 'text' in content[0]:
                     return content[0]['text']
-                    
+                
             except Exception as e:
                 logger.warning(f"Attempt {attempt + 1} failed: {str(e)}")
+                if isinstance(e, ClientError) and not _is_retryable(e):
+                    return None
                 if attempt < self.max_retries - 1:
-                    time.sleep(self.retry_delay * (2 ** attempt))
-        
+                    prev_delay = self._next_delay(prev_delay)
+                    await asyncio.sleep(prev_delay)
+    
         return None
     
     def validate_tool_call(self, tool_call: Dict[str, Any]) -> Dict[str, Any]:
@@ -322,10 +1063,8 @@ class BedrockHandler:
             Validation result with enterprise metadata
         """
         try:
-            required_fields = ['name', 'input']
-            missing_fields = [field for field in required_fields if field not in tool_call]
-            
-            if missing_fields:
+            if 'name' not in tool_call or 'input' not in tool_call:
+                missing_fields = [field for field in _REQUIRED_TOOL_FIELDS if field not in tool_call]
                 return {
                     "status": "error",
                     "message": f"Tool call missing required fields: {missing_fields}",
@@ -359,8 +1098,9 @@ class BedrockHandler:
     
     def extract_tool_calls(self, response: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
-        Extract tool calls from model response with enterprise validation.
-        Handles both Claude's native format and fallback format.
+        Extract tool calls from model response in a single pass.
+        Handles both Claude's native format and fallback format; use
+        validate_tool_call for detailed validation messages.
         
         Args:
             response: Model response
@@ -369,40 +1109,38 @@ class BedrockHandler:
             List of validated tool calls
         """
         try:
-            tool_calls = []
-            content = response.get('content', [])
-            
-            for item in content:
-                # Handle both formats: {'tool_use': {...}} and {'type': 'tool_use', ...}
-                if 'tool_use' in item:
-                    # Original format from Claude
-                    tool_call = item['tool_use']
-                    validation_result = self.validate_tool_call(tool_call)
-                    
-                    if validation_result['status'] == 'valid':
-                        tool_calls.append(tool_call)
-                    else:
-                        logger.warning(f"Invalid tool call: {validation_result['message']}")
-                        
-                elif item.get('type') == 'tool_use':
-                    # Fallback format (rule-based or alternative)
-                    tool_call = {
-                        'name': item.get('name'),
-                        'input': item.get('input')
-                    }
-                    validation_result = self.validate_tool_call(tool_call)
-                    
-                    if validation_result['status'] == 'valid':
-                        tool_calls.append(tool_call)
-                    else:
-                        logger.warning(f"Invalid tool call: {validation_result['message']}")
-            
-            return tool_calls
+            return [tool_call for item in response.get('content', [])
+                    if (tool_call := _fast_toolcall(item)) is not None]
             
         except Exception as e:
             logger.error(f"Error extracting tool calls: {str(e)}")
             return []
     
+    def extract_batch_tool_calls(self, response: Dict[str, Any]) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        Group tool_use blocks from a batched response by email id.
+        
+        Args:
+            response: Model response to a batched request
+            
+        Returns:
+            Mapping of email id to its tool_use content blocks (email_id removed from input)
+        """
+        grouped: Dict[int, List[Dict[str, Any]]] = {}
+        try:
+            for item in response.get('content', []):
+                if item.get('type') != 'tool_use' or not isinstance(item.get('input'), dict):
+                    continue
+                tool_input = dict(item['input'])
+                email_id = tool_input.pop('email_id', None)
+                if not isinstance(email_id, int):
+                    logger.warning(f"Batched tool call without email_id: {item.get('name')}")
+                    continue
+                grouped.setdefault(email_id, []).append({**item, 'input': tool_input})
+        except Exception as e:
+            logger.error(f"Error extracting batched tool calls: {str(e)}")
+        return grouped
+    
     def has_tool_calls(self, response: Dict[str, Any]) -> bool:
         """
         Check if response contains tool calls.
@@ -438,9 +1176,12 @@ class BedrockHandler:
             logger.error(f"Error extracting text content: {str(e)}")
             return ""
     
-    def create_system_prompt(self, context: str = "") -> str:
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def create_system_prompt(context: str = "") -> str:
         """
         Create enterprise system prompt for email processing.
+        Memoized per context so repeated calls return the identical string.
         
         Args:
             context: Additional enterprise context
@@ -448,36 +1189,9 @@ class BedrockHandler:
         Returns:
             Enterprise system prompt
         """
-        base_prompt = """
-        You are an enterprise AI email assistant designed for professional organizations. Your responsibilities include:
-
-        1. ANALYZE email content to determine if a response is needed
-        2. CLASSIFY emails by type, priority, and category with enterprise standards
-        3. GENERATE appropriate responses when needed with enterprise tone
-        4. SCHEDULE meetings when requested with enterprise validation
-        5. CREATE tasks for follow-up actions with enterprise metadata
-
-        ENTERPRISE RULES:
-        - When calling tools, you MUST provide ALL required arguments
-        - Validate your tool calls before executing them
-        - If unsure about any argument, ask for clarification rather than guessing
-        - Always provide meaningful summaries and descriptions
-        - Use appropriate enterprise tone and urgency levels
-        - Maintain professional standards throughout
-
-        Available enterprise tools:
-        - classify_email: Requires email_type, priority, category
-        - generate_draft: Requires tone, summary, urgency, response_type  
-        - schedule_meeting: Requires date, time, duration, attendees, meeting_title
-        - create_task: Requires title, description, due_date, priority, assignee
-
-        If no response is needed, return: {"action": "skip", "reason": "brief explanation"}
-        """
-        
-        if context:
-            base_prompt += f"\n\nAdditional enterprise context: {context}"
-        
-        return base_prompt.strip()
+        if not context:
+            return _BASE_SYSTEM_PROMPT
+        return f"{_BASE_SYSTEM_PROMPT}\n\nAdditional enterprise context: {context}".strip()
     
     def get_fallback_status(self, response: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -492,5 +1206,5 @@ class BedrockHandler:
         return {
             "fallback_used": response.get('fallback_mode') is not None,
             "fallback_type": response.get('fallback_mode', 'none'),
-            "model_used": self.current_model
+            "model_used": response.get('model_used', self.current_model)
         }
@@ -1,12 +1,202 @@
 ﻿import json
+import uuid
 import boto3
 import logging
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 from utils.logger import setup_logger
+from utils.helpers import validate_date_format, validate_time_format
 
 logger = setup_logger(__name__)
 
+# Allowed enum values (ordered tuples for error messages, frozensets for membership)
+_EMAIL_TYPES = ("inquiry", "complaint", "meeting_request", "task_assignment", "spam", "other")
+_CLASSIFY_PRIORITIES = ("low", "medium", "high", "urgent")
+_TONES = ("formal", "friendly", "neutral", "apologetic")
+_URGENCIES = ("low", "medium", "high")
+_RESPONSE_TYPES = ("acknowledgment", "information_request", "meeting_proposal", "task_confirmation")
+_TASK_PRIORITIES = ("low", "medium", "high")
+
+_VALID_EMAIL_TYPES = frozenset(_EMAIL_TYPES)
+_VALID_PRIORITIES_4 = frozenset(_CLASSIFY_PRIORITIES)
+_VALID_TONES = frozenset(_TONES)
+_VALID_URGENCIES = frozenset(_URGENCIES)
+_VALID_RESPONSE_TYPES = frozenset(_RESPONSE_TYPES)
+_VALID_PRIORITIES_3 = frozenset(_TASK_PRIORITIES)
+
+# Draft building blocks for _create_draft_content
+_GREETINGS = {
+    "formal": "Dear Sir/Madam,",
+    "friendly": "Hi there!",
+    "neutral": "Hello,",
+    "apologetic": "Dear [Name],"
+}
+
+_URGENCY_LANGUAGE = {
+    "low": "I'll get back to you when I have a chance.",
+    "medium": "I'll respond to this shortly.",
+    "high": "I'll prioritize this and respond as soon as possible."
+}
+
+_DRAFT_TEMPLATES = {
+    "acknowledgment": "Thank you for reaching out regarding {summary}. {urgency}",
+    "information_request": "I received your inquiry about {summary}. Let me gather the information you need. {urgency}",
+    "meeting_proposal": "Thank you for your meeting request regarding {summary}. I'd be happy to schedule a time to discuss this further. {urgency}",
+    "task_confirmation": "I've received your request about {summary} and will add it to my task list. {urgency}"
+}
+
+_DRAFT_ENVELOPE = """{greeting}
+
+{body}
+
+Best regards,
+AI Assistant"""
+
+# Every valid (tone, response_type, urgency) draft, split around the {summary} slot
+_DRAFT_PARTS = {
+    (tone, response_type, urgency): tuple(_DRAFT_ENVELOPE.format(
+        greeting=greeting,
+        body=template.replace("{urgency}", phrase)
+    ).split("{summary}"))
+    for tone, greeting in _GREETINGS.items()
+    for response_type, template in _DRAFT_TEMPLATES.items()
+    for urgency, phrase in _URGENCY_LANGUAGE.items()
+}
+
+
+def _missing_args_error(*named_args) -> Dict[str, Any]:
+    """Build the error result naming each (name, value) pair whose value is empty"""
+    missing_args = [name for name, value in named_args if not value]
+    return {
+        "status": "error",
+        "message": f"Missing required arguments: {', '.join(missing_args)}"
+    }
+
+
+# Tool schemas are static; built once at import and shared
+_TOOL_SCHEMAS = [
+    {
+        "name": "classify_email",
+        "description": "Classify the email type and determine priority level",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "email_type": {
+                    "type": "string",
+                    "enum": ["inquiry", "complaint", "meeting_request", "task_assignment", "spam", "other"],
+                    "description": "The type of email received"
+                },
+                "priority": {
+                    "type": "string", 
+                    "enum": ["low", "medium", "high", "urgent"],
+                    "description": "Priority level of the email"
+                },
+                "category": {
+                    "type": "string",
+                    "description": "Brief category description"
+                }
+            },
+            "required": ["email_type", "priority", "category"]
+        }
+    },
+    {
+        "name": "generate_draft",
+        "description": "Generate a professional draft response to the email",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "tone": {
+                    "type": "string",
+                    "enum": ["formal", "friendly", "neutral", "apologetic"],
+                    "description": "Tone of the response"
+                },
+                "summary": {
+                    "type": "string",
+                    "description": "Brief summary of the email content"
+                },
+                "urgency": {
+                    "type": "string",
+                    "enum": ["low", "medium", "high"],
+                    "description": "Urgency level for response"
+                },
+                "response_type": {
+                    "type": "string",
+                    "enum": ["acknowledgment", "information_request", "meeting_proposal", "task_confirmation"],
+                    "description": "Type of response needed"
+                }
+            },
+            "required": ["tone", "summary", "urgency", "response_type"]
+        }
+    },
+    {
+        "name": "schedule_meeting",
+        "description": "Schedule a meeting based on email request",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "date": {
+                    "type": "string",
+                    "format": "date",
+                    "description": "Meeting date in YYYY-MM-DD format"
+                },
+                "time": {
+                    "type": "string",
+                    "description": "Meeting time in HH:MM format"
+                },
+                "duration": {
+                    "type": "integer",
+                    "minimum": 15,
+                    "maximum": 480,
+                    "description": "Meeting duration in minutes"
+                },
+                "attendees": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "minItems": 1,
+                    "description": "List of attendee email addresses"
+                },
+                "meeting_title": {
+                    "type": "string",
+                    "description": "Title/subject of the meeting"
+                }
+            },
+            "required": ["date", "time", "duration", "attendees", "meeting_title"]
+        }
+    },
+    {
+        "name": "create_task",
+        "description": "Create a follow-up task based on email content",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "title": {
+                    "type": "string",
+                    "description": "Task title"
+                },
+                "description": {
+                    "type": "string",
+                    "description": "Detailed task description"
+                },
+                "due_date": {
+                    "type": "string",
+                    "format": "date",
+                    "description": "Due date in YYYY-MM-DD format"
+                },
+                "priority": {
+                    "type": "string",
+                    "enum": ["low", "medium", "high"],
+                    "description": "Task priority"
+                },
+                "assignee": {
+                    "type": "string",
+                    "description": "Email of person assigned to task"
+                }
+            },
+            "required": ["title", "description", "due_date", "priority", "assignee"]
+        }
+    }
+]
+
 class EmailTools:
     """
     Email processing tools with robust argument validation.
@@ -14,132 +204,22 @@ class EmailTools:
     """
     
     def __init__(self):
-        self.s3_client = boto3.client('s3')
+        self._s3_client = None
+        self._tools = _TOOL_SCHEMAS
+    
+    @property
+    def s3_client(self):
+        """S3 client, created on first use."""
+        if self._s3_client is None:
+            self._s3_client = boto3.client('s3')
+        return self._s3_client
         
     def get_available_tools(self) -> List[Dict[str, Any]]:
-        """Return list of available tools with complete schemas."""
-        return [
-            {
-                "name": "classify_email",
-                "description": "Classify the email type and determine priority level",
-                "input_schema": {
-                    "type": "object",
-                    "properties": {
-                        "email_type": {
-                            "type": "string",
-                            "enum": ["inquiry", "complaint", "meeting_request", "task_assignment", "spam", "other"],
-                            "description": "The type of email received"
-                        },
-                        "priority": {
-                            "type": "string", 
-                            "enum": ["low", "medium", "high", "urgent"],
-                            "description": "Priority level of the email"
-                        },
-                        "category": {
-                            "type": "string",
-                            "description": "Brief category description"
-                        }
-                    },
-                    "required": ["email_type", "priority", "category"]
-                }
-            },
-            {
-                "name": "generate_draft",
-                "description": "Generate a professional draft response to the email",
-                "input_schema": {
-                    "type": "object",
-                    "properties": {
-                        "tone": {
-                            "type": "string",
-                            "enum": ["formal", "friendly", "neutral", "apologetic"],
-                            "description": "Tone of the response"
-                        },
-                        "summary": {
-                            "type": "string",
-                            "description": "Brief summary of the email content"
-                        },
-                        "urgency": {
-                            "type": "string",
-                            "enum": ["low", "medium", "high"],
-                            "description": "Urgency level for response"
-                        },
-                        "response_type": {
-                            "type": "string",
-                            "enum": ["acknowledgment", "information_request", "meeting_proposal", "task_confirmation"],
-                            "description": "Type of response needed"
-                        }
-                    },
-                    "required": ["tone", "summary", "urgency", "response_type"]
-                }
-            },
-            {
-                "name": "schedule_meeting",
-                "description": "Schedule a meeting based on email request",
-                "input_schema": {
-                    "type": "object",
-                    "properties": {
-                        "date": {
-                            "type": "string",
-                            "format": "date",
-                            "description": "Meeting date in YYYY-MM-DD format"
-                        },
-                        "time": {
-                            "type": "string",
-                            "description": "Meeting time in HH:MM format"
-                        },
-                        "duration": {
-                            "type": "integer",
-                            "minimum": 15,
-                            "maximum": 480,
-                            "description": "Meeting duration in minutes"
-                        },
-                        "attendees": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "minItems": 1,
-                            "description": "List of attendee email addresses"
-                        },
-                        "meeting_title": {
-                            "type": "string",
-                            "description": "Title/subject of the meeting"
-                        }
-                    },
-                    "required": ["date", "time", "duration", "attendees", "meeting_title"]
-                }
-            },
-            {
-                "name": "create_task",
-                "description": "Create a follow-up task based on email content",
-                "input_schema": {
-                    "type": "object",
-                    "properties": {
-                        "title": {
-                            "type": "string",
-                            "description": "Task title"
-                        },
-                        "description": {
-                            "type": "string",
-                            "description": "Detailed task description"
-                        },
-                        "due_date": {
-                            "type": "string",
-                            "format": "date",
-                            "description": "Due date in YYYY-MM-DD format"
-                        },
-                        "priority": {
-                            "type": "string",
-                            "enum": ["low", "medium", "high"],
-                            "description": "Task priority"
-                        },
-                        "assignee": {
-                            "type": "string",
-                            "description": "Email of person assigned to task"
-                        }
-                    },
-                    "required": ["title", "description", "due_date", "priority", "assignee"]
-                }
-            }
-        ]
+        """
+        Return list of available tools with complete schemas.
+        The same list is returned on every call; callers must not mutate it.
+        """
+        return self._tools
     
     def classify_email(self, email_type: str, priority: str, category: str) -> Dict[str, Any]:
         """
@@ -162,19 +242,16 @@ class EmailTools:
                 }
             
             # Validate enum values
-            valid_types = ["inquiry", "complaint", "meeting_request", "task_assignment", "spam", "other"]
-            valid_priorities = ["low", "medium", "high", "urgent"]
-            
-            if email_type not in valid_types:
+            if email_type not in _VALID_EMAIL_TYPES:
                 return {
                     "status": "error", 
-                    "message": f"Invalid email_type. Must be one of: {valid_types}"
+                    "message": f"Invalid email_type. Must be one of: {list(_EMAIL_TYPES)}"
                 }
             
-            if priority not in valid_priorities:
+            if priority not in _VALID_PRIORITIES_4:
                 return {
                     "status": "error",
-                    "message": f"Invalid priority. Must be one of: {valid_priorities}"
+                    "message": f"Invalid priority. Must be one of: {list(_CLASSIFY_PRIORITIES)}"
                 }
             
             classification = {
@@ -188,7 +265,7 @@ class EmailTools:
                 }
             }
             
-            logger.info(f"Email classified: {classification}")
+            logger.info("Email classified: %s", classification)
             return classification
             
         except Exception as e:
@@ -210,36 +287,26 @@ class EmailTools:
         """
         try:
             # Validate required arguments
-            required_args = {"tone": tone, "summary": summary, "urgency": urgency, "response_type": response_type}
-            missing_args = [k for k, v in required_args.items() if not v]
-            
-            if missing_args:
-                return {
-                    "status": "error",
-                    "message": f"Missing required arguments: {', '.join(missing_args)}"
-                }
+            if not (tone and summary and urgency and response_type):
+                return _missing_args_error(("tone", tone), ("summary", summary), ("urgency", urgency), ("response_type", response_type))
             
             # Validate enum values
-            valid_tones = ["formal", "friendly", "neutral", "apologetic"]
-            valid_urgencies = ["low", "medium", "high"]
-            valid_response_types = ["acknowledgment", "information_request", "meeting_proposal", "task_confirmation"]
-            
-            if tone not in valid_tones:
+            if tone not in _VALID_TONES:
                 return {
                     "status": "error",
-                    "message": f"Invalid tone. Must be one of: {valid_tones}"
+                    "message": f"Invalid tone. Must be one of: {list(_TONES)}"
                 }
             
-            if urgency not in valid_urgencies:
+            if urgency not in _VALID_URGENCIES:
                 return {
                     "status": "error",
-                    "message": f"Invalid urgency. Must be one of: {valid_urgencies}"
+                    "message": f"Invalid urgency. Must be one of: {list(_URGENCIES)}"
                 }
             
-            if response_type not in valid_response_types:
+            if response_type not in _VALID_RESPONSE_TYPES:
                 return {
                     "status": "error",
-                    "message": f"Invalid response_type. Must be one of: {valid_response_types}"
+                    "message": f"Invalid response_type. Must be one of: {list(_RESPONSE_TYPES)}"
                 }
             
             # Generate draft based on parameters
@@ -257,7 +324,7 @@ class EmailTools:
                 }
             }
             
-            logger.info(f"Draft generated: {draft}")
+            logger.info("Draft generated: %s", draft)
             return draft
             
         except Exception as e:
@@ -280,14 +347,8 @@ class EmailTools:
         """
         try:
             # Validate required arguments
-            required_args = {"date": date, "time": time, "duration": duration, "attendees": attendees, "meeting_title": meeting_title}
-            missing_args = [k for k, v in required_args.items() if not v]
-            
-            if missing_args:
-                return {
-                    "status": "error",
-                    "message": f"Missing required arguments: {', '.join(missing_args)}"
-                }
+            if not (date and time and duration and attendees and meeting_title):
+                return _missing_args_error(("date", date), ("time", time), ("duration", duration), ("attendees", attendees), ("meeting_title", meeting_title))
             
             # Validate duration
             if not isinstance(duration, int) or duration < 15 or duration > 480:
@@ -304,18 +365,14 @@ class EmailTools:
                 }
             
             # Validate date format
-            try:
-                datetime.strptime(date, "%Y-%m-%d")
-            except ValueError:
+            if not validate_date_format(date):
                 return {
                     "status": "error",
                     "message": "Date must be in YYYY-MM-DD format"
                 }
             
             # Validate time format
-            try:
-                datetime.strptime(time, "%H:%M")
-            except ValueError:
+            if not validate_time_format(time):
                 return {
                     "status": "error",
                     "message": "Time must be in HH:MM format"
@@ -329,12 +386,12 @@ class EmailTools:
                     "time": time,
                     "duration": duration,
                     "attendees": attendees,
-                    "meeting_id": f"meeting_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}",
+                    "meeting_id": f"meeting_{uuid.uuid4().hex[:12]}",
                     "timestamp": datetime.utcnow().isoformat()
                 }
             }
             
-            logger.info(f"Meeting scheduled: {meeting}")
+            logger.info("Meeting scheduled: %s", meeting)
             return meeting
             
         except Exception as e:
@@ -357,27 +414,18 @@ class EmailTools:
         """
         try:
             # Validate required arguments
-            required_args = {"title": title, "description": description, "due_date": due_date, "priority": priority, "assignee": assignee}
-            missing_args = [k for k, v in required_args.items() if not v]
-            
-            if missing_args:
-                return {
-                    "status": "error",
-                    "message": f"Missing required arguments: {', '.join(missing_args)}"
-                }
+            if not (title and description and due_date and priority and assignee):
+                return _missing_args_error(("title", title), ("description", description), ("due_date", due_date), ("priority", priority), ("assignee", assignee))
             
             # Validate priority
-            valid_priorities = ["low", "medium", "high"]
-            if priority not in valid_priorities:
+            if priority not in _VALID_PRIORITIES_3:
                 return {
                     "status": "error",
-                    "message": f"Invalid priority. Must be one of: {valid_priorities}"
+                    "message": f"Invalid priority. Must be one of: {list(_TASK_PRIORITIES)}"
                 }
             
             # Validate date format
-            try:
-                datetime.strptime(due_date, "%Y-%m-%d")
-            except ValueError:
+            if not validate_date_format(due_date):
                 return {
                     "status": "error",
                     "message": "Due date must be in YYYY-MM-DD format"
@@ -391,13 +439,13 @@ class EmailTools:
                     "due_date": due_date,
                     "priority": priority,
                     "assignee": assignee,
-                    "task_id": f"task_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}",
+                    "task_id": f"task_{uuid.uuid4().hex[:12]}",
                     "status": "pending",
                     "timestamp": datetime.utcnow().isoformat()
                 }
             }
             
-            logger.info(f"Task created: {task}")
+            logger.info("Task created: %s", task)
             return task
             
         except Exception as e:
@@ -406,38 +454,12 @@ class EmailTools:
     
     def _create_draft_content(self, tone: str, summary: str, urgency: str, response_type: str) -> str:
         """Create draft email content based on parameters."""
+        parts = _DRAFT_PARTS.get((tone, response_type, urgency))
+        if parts is not None:
+            return parts[0] + summary + parts[1]
         
-        # Tone-based greetings
-        greetings = {
-            "formal": "Dear Sir/Madam,",
-            "friendly": "Hi there!",
-            "neutral": "Hello,",
-            "apologetic": "Dear [Name],"
-        }
-        
-        # Urgency-based language
-        urgency_language = {
-            "low": "I'll get back to you when I have a chance.",
-            "medium": "I'll respond to this shortly.",
-            "high": "I'll prioritize this and respond as soon as possible."
-        }
-        
-        # Response type templates
-        templates = {
-            "acknowledgment": f"Thank you for reaching out regarding {summary}. {urgency_language[urgency]}",
-            "information_request": f"I received your inquiry about {summary}. Let me gather the information you need. {urgency_language[urgency]}",
-            "meeting_proposal": f"Thank you for your meeting request regarding {summary}. I'd be happy to schedule a time to discuss this further. {urgency_language[urgency]}",
-            "task_confirmation": f"I've received your request about {summary} and will add it to my task list. {urgency_language[urgency]}"
-        }
-        
-        greeting = greetings.get(tone, "Hello,")
-        template = templates.get(response_type, templates["acknowledgment"])
-        
-        draft = f"""{greeting}
-
-{template}
-
-Best regards,
-AI Assistant"""
-        
-        return draft
+        template = _DRAFT_TEMPLATES.get(response_type, _DRAFT_TEMPLATES["acknowledgment"])
+        return _DRAFT_ENVELOPE.format(
+            greeting=_GREETINGS.get(tone, "Hello,"),
+            body=template.format(summary=summary, urgency=_URGENCY_LANGUAGE[urgency])
+        )
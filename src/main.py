@@ -1,23 +1,98 @@
 ﻿import json
 import boto3
+import asyncio
 import os
 import logging
+import time
 import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any, Optional
-from email_tools import EmailTools
-from tool_router import ToolRouter
-from bedrock_handler import BedrockHandler
+from decimal import Decimal
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple
+from boto3.dynamodb.types import TypeSerializer
 from utils.logger import setup_logger
 
+# Fast JSON for API bodies and logging (falls back to the standard library)
+try:
+    import orjson
+    
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode('utf-8')
+    
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(obj: Any) -> str:
+        # Match orjson's output: raw UTF-8 and no whitespace
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+    
+    _json_loads = json.loads
+
 # Initialize logger
 logger = setup_logger(__name__)
 
-# Initialize AWS clients
-dynamodb = boto3.resource('dynamodb')
-bedrock_handler = BedrockHandler()
-email_tools = EmailTools()
-tool_router = ToolRouter()
+# AWS clients and handlers are created on first use and reused across warm invocations
+AUDIT_TABLE_NAME = os.getenv('DYNAMODB_AUDIT_TABLE', 'email-audit-log')
+CLASSIFICATION_TABLE_NAME = os.getenv('DYNAMODB_CLASSIFICATION_TABLE', 'email-classifications')
+_serializer = TypeSerializer()
+
+@lru_cache(maxsize=1)
+def get_dynamodb():
+    """Low-level DynamoDB client."""
+    return boto3.client('dynamodb')
+
+@lru_cache(maxsize=1)
+def get_bedrock_handler():
+    """Bedrock handler; imports aioboto3 on first call."""
+    from bedrock_handler import BedrockHandler
+    return BedrockHandler()
+
+@lru_cache(maxsize=1)
+def get_email_tools():
+    """Email tools providing the tool schemas."""
+    from email_tools import EmailTools
+    return EmailTools()
+
+@lru_cache(maxsize=1)
+def get_tool_router():
+    """Router executing Claude's tool calls."""
+    from tool_router import ToolRouter
+    return ToolRouter()
+
+# Prompt text is fixed; the system prompt must stay byte-identical for Bedrock prompt caching
+_SYSTEM_PROMPT = """
+    You are an AI email assistant that helps process incoming emails. Your job is to:
+    
+    1. Analyze the email content to determine if a response is needed
+    2. If no response is needed, return {"action": "skip", "reason": "brief explanation"}
+    3. If a response is needed, use the appropriate tool with ALL required arguments
+    
+    IMPORTANT: When calling tools, you MUST provide ALL required arguments. Check the tool schema carefully.
+    
+    Available tools:
+    - classify_email: Categorize the email type and priority
+    - generate_draft: Create a draft response (requires tone, summary, and urgency)
+    - schedule_meeting: Schedule a meeting (requires date, time, duration, and attendees)
+    - create_task: Create a follow-up task (requires title, description, and due_date)
+    
+    Always validate that you have all required arguments before calling any tool.
+    """
+
+_EMAIL_TEMPLATE = """
+Subject: {subject}
+From: {sender}
+To: {recipient}
+
+{body}
+
+Metadata: {metadata}
+"""
+
+# Event loop for async Bedrock calls, kept across warm Lambda invocations
+_loop = asyncio.new_event_loop()
+
+# Background DynamoDB writes that overlap with the Bedrock call
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="ddb-write")
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
@@ -31,30 +106,41 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     Returns:
         Dict containing processing status and results
     """
+    # Records written together in one BatchWriteItem once the request settles
+    pending_writes: List[Tuple[str, Dict[str, Any]]] = []
+    started_write: Optional[Future] = None
+    
     try:
         # Generate unique request ID for tracking
         request_id = str(uuid.uuid4())
-        logger.info(f"Processing request {request_id}: {json.dumps(event)}")
+        logger.info("Processing request %s", request_id)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Request %s event: %s", request_id, _json_dumps(event))
         
         # Extract email data from API Gateway event
         email_data = extract_email_from_api_event(event)
         
-        # Log audit trail
+        # Log audit trail; written in the background while Claude runs.
+        # A copy is submitted because audit_log is updated in place below.
         audit_log = create_audit_log(request_id, email_data, "PROCESSING_STARTED")
-        save_audit_log(audit_log)
+        started_write = _executor.submit(save_audit_log, dict(audit_log))
         
         # Process email with Claude
-        result = process_email_with_claude(email_data, request_id)
+        result = process_email_with_claude(email_data, request_id, pending_writes)
         
         # Update audit log with results
+        completed_at = datetime.utcnow().isoformat()
         audit_log.update({
             "status": "COMPLETED",
             "result": result,
-            "completed_at": datetime.utcnow().isoformat()
+            "completed_at": completed_at
         })
-        save_audit_log(audit_log)
+        pending_writes.append((AUDIT_TABLE_NAME, audit_log))
+        # The completed record shares its key with the started one and must land after it
+        started_write.result()
+        save_batch(pending_writes)
         
-        logger.info(f"Email processing completed for request {request_id}: {result}")
+        logger.info("Email processing completed for request %s: %s", request_id, result)
         
         # Return enterprise-standard response
         return {
@@ -64,11 +150,11 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 "X-Request-ID": request_id,
                 "X-Processing-Time": str(result.get("processing_time_ms", 0))
             },
-            "body": json.dumps({
+            "body": _json_dumps({
                 "request_id": request_id,
                 "status": "success",
                 "result": result,
-                "timestamp": datetime.utcnow().isoformat()
+                "timestamp": completed_at
             })
         }
         
@@ -78,7 +164,10 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         # Log error in audit trail
         error_audit = create_audit_log(request_id if 'request_id' in locals() else str(uuid.uuid4()), 
                                      {"error": str(e)}, "ERROR")
-        save_audit_log(error_audit)
+        pending_writes.append((AUDIT_TABLE_NAME, error_audit))
+        if started_write is not None:
+            started_write.result()
+        save_batch(pending_writes)
         
         return {
             "statusCode": 500,
@@ -86,7 +175,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 "Content-Type": "application/json",
                 "X-Request-ID": request_id if 'request_id' in locals() else str(uuid.uuid4())
             },
-            "body": json.dumps({
+            "body": _json_dumps({
                 "request_id": request_id if 'request_id' in locals() else str(uuid.uuid4()),
                 "status": "error",
                 "error": str(e),
@@ -97,11 +186,12 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
 def extract_email_from_api_event(event: Dict[str, Any]) -> Dict[str, Any]:
     """Extract email data from API Gateway event."""
     try:
-        # Handle different event formats
-        if 'body' in event:
-            body = json.loads(event['body']) if isinstance(event['body'], str) else event['body']
-        else:
+        # Handle different event formats: API Gateway string body, pre-parsed body, or direct invoke
+        body = event.get('body')
+        if body is None:
             body = event
+        elif isinstance(body, (str, bytes)):
+            body = _json_loads(body)
             
         # Extract email fields
         email_data = {
@@ -113,7 +203,7 @@ def extract_email_from_api_event(event: Dict[str, Any]) -> Dict[str, Any]:
             "metadata": body.get("metadata", {})
         }
         
-        logger.info(f"Extracted email data: {email_data}")
+        logger.info("Extracted email data: %s", email_data)
         return email_data
         
     except Exception as e:
@@ -122,37 +212,81 @@ def extract_email_from_api_event(event: Dict[str, Any]) -> Dict[str, Any]:
 
 def create_audit_log(request_id: str, email_data: Dict[str, Any], status: str) -> Dict[str, Any]:
     """Create audit log entry for compliance tracking."""
+    now_iso = datetime.utcnow().isoformat()
     return {
         "email_id": request_id,
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": now_iso,
         "user_id": email_data.get("user_id", "anonymous"),
         "status": status,
         "email_subject": email_data.get("subject", ""),
         "email_sender": email_data.get("sender", ""),
-        "processing_started_at": datetime.utcnow().isoformat(),
+        "processing_started_at": now_iso,
         "metadata": email_data.get("metadata", {})
     }
 
+def _ddb_value(value: Any) -> Any:
+    """Convert floats (rejected by TypeSerializer) to Decimal, recursively."""
+    if isinstance(value, float):
+        return Decimal(str(value))
+    if isinstance(value, dict):
+        return {k: _ddb_value(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_ddb_value(v) for v in value]
+    return value
+
+def serialize_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a plain dict to DynamoDB AttributeValue form for the low-level client."""
+    return {k: _serializer.serialize(_ddb_value(v)) for k, v in item.items()}
+
 def save_audit_log(audit_log: Dict[str, Any]) -> None:
     """Save audit log to DynamoDB for compliance."""
     try:
-        table_name = os.getenv('DYNAMODB_AUDIT_TABLE', 'email-audit-log')
-        table = dynamodb.Table(table_name)
-        
-        table.put_item(Item=audit_log)
-        logger.info(f"Audit log saved: {audit_log['email_id']}")
+        get_dynamodb().put_item(TableName=AUDIT_TABLE_NAME, Item=serialize_item(audit_log))
+        logger.info("Audit log saved: %s", audit_log['email_id'])
         
     except Exception as e:
         logger.error(f"Failed to save audit log: {str(e)}")
         # Don't raise - audit logging failure shouldn't break main flow
 
-def process_email_with_claude(email_data: Dict[str, Any], request_id: str) -> Dict[str, Any]:
+def save_batch(writes: List[Tuple[str, Dict[str, Any]]], max_attempts: int = 3) -> None:
+    """
+    Save audit and classification records in a single BatchWriteItem call.
+    
+    Args:
+        writes: (table_name, item) pairs; keys must be unique within the batch
+        max_attempts: Attempts for items DynamoDB returns as unprocessed
+    """
+    if not writes:
+        return
+    
+    request_items: Dict[str, List[Dict[str, Any]]] = {}
+    try:
+        for table_name, item in writes:
+            request_items.setdefault(table_name, []).append({"PutRequest": {"Item": serialize_item(item)}})
+        
+        for attempt in range(max_attempts):
+            response = get_dynamodb().batch_write_item(RequestItems=request_items)
+            request_items = response.get("UnprocessedItems") or {}
+            if not request_items:
+                logger.info("Saved %s records in one batch", len(writes))
+                return
+            time.sleep(0.05 * (2 ** attempt))
+        
+        logger.error(f"Failed to save {sum(len(v) for v in request_items.values())} records: still unprocessed")
+        
+    except Exception as e:
+        logger.error(f"Failed to save batch: {str(e)}")
+        # Don't raise - audit logging failure shouldn't break main flow
+
+def process_email_with_claude(email_data: Dict[str, Any], request_id: str,
+                              pending_writes: Optional[List[Tuple[str, Dict[str, Any]]]] = None) -> Dict[str, Any]:
     """
     Process email content with Claude 3 Sonnet using tool calling.
     
     Args:
         email_data: Email data dictionary
         request_id: Unique request identifier
+        pending_writes: Collects records for the caller to batch; written immediately if None
         
     Returns:
         Dict containing processing results
@@ -161,25 +295,25 @@ def process_email_with_claude(email_data: Dict[str, Any], request_id: str) -> Di
         start_time = datetime.utcnow()
         
         # Define available tools for Claude
-        tools = email_tools.get_available_tools()
+        tools = get_email_tools().get_available_tools()
         
-        # Create system prompt
+        # System prompt is static so the prompt cache prefix stays byte-identical
         system_prompt = create_system_prompt()
         
         # Format email content for Claude
         email_content = format_email_for_claude(email_data)
         
         # Send request to Claude
-        response = bedrock_handler.invoke_model_with_tools(
+        response = _loop.run_until_complete(get_bedrock_handler().invoke_model_with_tools(
             messages=[
-                {"role": "system", "content": system_prompt},
                 {"role": "user", "content": email_content}
             ],
-            tools=tools
-        )
+            tools=tools,
+            system=system_prompt
+        ))
         
         # Process Claude's response
-        result = process_claude_response(response, email_data, request_id)
+        result = process_claude_response(response, email_data, request_id, pending_writes)
         
         # Add processing time
         processing_time = (datetime.utcnow() - start_time).total_seconds() * 1000
@@ -193,37 +327,20 @@ def process_email_with_claude(email_data: Dict[str, Any], request_id: str) -> Di
 
 def format_email_for_claude(email_data: Dict[str, Any]) -> str:
     """Format email data for Claude processing."""
-    return f"""
-Subject: {email_data.get('subject', 'No Subject')}
-From: {email_data.get('sender', 'Unknown Sender')}
-To: {email_data.get('recipient', 'Unknown Recipient')}
-
-{email_data.get('body', 'No content')}
-
-Metadata: {json.dumps(email_data.get('metadata', {}))}
-"""
+    return _EMAIL_TEMPLATE.format(
+        subject=email_data.get('subject', 'No Subject'),
+        sender=email_data.get('sender', 'Unknown Sender'),
+        recipient=email_data.get('recipient', 'Unknown Recipient'),
+        body=email_data.get('body', 'No content'),
+        metadata=_json_dumps(email_data.get('metadata', {}))
+    )
 
 def create_system_prompt() -> str:
     """Create system prompt for Claude."""
-    return """
-    You are an AI email assistant that helps process incoming emails. Your job is to:
-    
-    1. Analyze the email content to determine if a response is needed
-    2. If no response is needed, return {"action": "skip", "reason": "brief explanation"}
-    3. If a response is needed, use the appropriate tool with ALL required arguments
-    
-    IMPORTANT: When calling tools, you MUST provide ALL required arguments. Check the tool schema carefully.
-    
-    Available tools:
-    - classify_email: Categorize the email type and priority
-    - generate_draft: Create a draft response (requires tone, summary, and urgency)
-    - schedule_meeting: Schedule a meeting (requires date, time, duration, and attendees)
-    - create_task: Create a follow-up task (requires title, description, and due_date)
-    
-    Always validate that you have all required arguments before calling any tool.
-    """
+    return _SYSTEM_PROMPT
 
-def process_claude_response(response: Dict[str, Any], email_data: Dict[str, Any], request_id: str) -> Dict[str, Any]:
+def process_claude_response(response: Dict[str, Any], email_data: Dict[str, Any], request_id: str,
+                            pending_writes: Optional[List[Tuple[str, Dict[str, Any]]]] = None) -> Dict[str, Any]:
     """
     Process Claude's response and execute tool calls if needed.
     
@@ -231,6 +348,7 @@ def process_claude_response(response: Dict[str, Any], email_data: Dict[str, Any]
         response: Claude's response containing tool calls or decisions
         email_data: Original email data
         request_id: Unique request identifier
+        pending_writes: Collects records for the caller to batch; written immediately if None
         
     Returns:
         Dict containing processing results
@@ -251,24 +369,32 @@ def process_claude_response(response: Dict[str, Any], email_data: Dict[str, Any]
                 pass
         
         # Process tool calls
+        # Only the first tool call is acted on
         for item in content:
-            if 'tool_use' in item:
-                tool_call = item['tool_use']
-                tool_name = tool_call['name']
-                tool_args = tool_call['input']
-                
-                logger.info(f"Executing tool: {tool_name} with args: {tool_args}")
-                
-                # Route tool call to appropriate handler
-                result = tool_router.route_tool_call(tool_name, tool_args, email_data, request_id)
-                
-                if result.get('status') == 'success':
-                    # Save classification to DynamoDB
-                    save_classification_to_db(result, email_data, request_id)
-                    return result
-                else:
-                    logger.error(f"Tool execution failed: {result}")
-                    return result
+            tool_call = item.get('tool_use')
+            if tool_call is None:
+                continue
+            
+            tool_name = tool_call['name']
+            tool_args = tool_call['input']
+            logger.info("Executing tool: %s with args: %s", tool_name, tool_args)
+            
+            # Route tool call to appropriate handler
+            result = get_tool_router().route_tool_call(tool_name, tool_args, email_data, request_id)
+            
+            if result.get('status') != 'success':
+                logger.error("Tool execution failed: %s", result)
+                return result
+            
+            # Save classification to DynamoDB
+            if pending_writes is None:
+                save_classification_to_db(result, email_data, request_id)
+            else:
+                pending_writes.append((
+                    CLASSIFICATION_TABLE_NAME,
+                    create_classification_item(result, email_data, request_id)
+                ))
+            return result
         
         # If no tool calls, treat as skip
         return {'status': 'skipped', 'reason': 'No action required'}
@@ -277,24 +403,27 @@ def process_claude_response(response: Dict[str, Any], email_data: Dict[str, Any]
         logger.error(f"Error processing Claude response: {str(e)}")
         return {'status': 'error', 'message': str(e)}
 
+def create_classification_item(result: Dict[str, Any], email_data: Dict[str, Any], request_id: str) -> Dict[str, Any]:
+    """Create classification record for enterprise tracking."""
+    now = datetime.utcnow()
+    return {
+        "classification_id": request_id,
+        "email_subject": email_data.get("subject", ""),
+        "email_sender": email_data.get("sender", ""),
+        "user_id": email_data.get("user_id", "anonymous"),
+        # Snapshot: the caller adds processing_time_ms to result afterwards
+        "classification_result": dict(result),
+        "timestamp": now.isoformat(),
+        "ttl": int((now.timestamp() + (365 * 24 * 60 * 60)))  # 1 year TTL
+    }
+
 def save_classification_to_db(result: Dict[str, Any], email_data: Dict[str, Any], request_id: str) -> None:
     """Save classification result to DynamoDB for enterprise tracking."""
     try:
-        table_name = os.getenv('DYNAMODB_CLASSIFICATION_TABLE', 'email-classifications')
-        table = dynamodb.Table(table_name)
-        
-        classification_item = {
-            "classification_id": request_id,
-            "email_subject": email_data.get("subject", ""),
-            "email_sender": email_data.get("sender", ""),
-            "user_id": email_data.get("user_id", "anonymous"),
-            "classification_result": result,
-            "timestamp": datetime.utcnow().isoformat(),
-            "ttl": int((datetime.utcnow().timestamp() + (365 * 24 * 60 * 60)))  # 1 year TTL
-        }
+        classification_item = create_classification_item(result, email_data, request_id)
         
-        table.put_item(Item=classification_item)
-        logger.info(f"Classification saved to DynamoDB: {request_id}")
+        get_dynamodb().put_item(TableName=CLASSIFICATION_TABLE_NAME, Item=serialize_item(classification_item))
+        logger.info("Classification saved to DynamoDB: %s", request_id)
         
     except Exception as e:
         logger.error(f"Failed to save classification to DynamoDB: {str(e)}")
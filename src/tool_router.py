@@ -1,11 +1,62 @@
 ﻿import json
 import logging
-from typing import Dict, Any, List
+from typing import Callable, Dict, Any, FrozenSet, List, Optional
 from email_tools import EmailTools
 from utils.logger import setup_logger
 
+# Optional compiled schema validators (falls back to the hand-rolled checks)
+try:
+    import fastjsonschema
+    FASTJSONSCHEMA_AVAILABLE = True
+except ImportError:
+    FASTJSONSCHEMA_AVAILABLE = False
+
 logger = setup_logger(__name__)
 
+_DRAFT4 = "http://json-schema.org/draft-04/schema#"
+
+# JSON schema type -> (check, description used in the error message).
+# bool is an int subclass but not a JSON integer, so it is rejected explicitly.
+_TYPE_CHECKS = {
+    "string": (lambda value: isinstance(value, str), "a string"),
+    "integer": (lambda value: isinstance(value, int) and not isinstance(value, bool), "an integer"),
+    "array": (lambda value: isinstance(value, list), "an array"),
+}
+
+
+def _compile_validator(schema: Dict[str, Any]) -> Optional[Callable[[Dict[str, Any]], Any]]:
+    """
+    Compile a schema into an accept-only fast path for _validate_tool_args.
+    
+    Draft-04 integer rules match the hand-rolled isinstance(value, int) check
+    (draft-06+ would also accept 30.0), and "format" is dropped because the
+    hand-rolled checks never enforced it.
+    
+    Args:
+        schema: Tool input_schema
+        
+    Returns:
+        Validator callable, or None if unavailable
+    """
+    if not FASTJSONSCHEMA_AVAILABLE:
+        return None
+    properties = {
+        name: {k: v for k, v in field.items() if k not in ("format", "description")}
+        for name, field in schema.get("properties", {}).items()
+    }
+    try:
+        return fastjsonschema.compile({"$schema": _DRAFT4, "type": "object", "properties": properties})
+    except Exception as e:
+        logger.error("Failed to compile validator: %s", e)
+        return None
+
+
+def _email_context(email_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Email fields attached to every successful tool result."""
+    get = email_data.get
+    return {"subject": get("subject", ""), "sender": get("sender", ""), "user_id": get("user_id", "anonymous")}
+
+
 class ToolRouter:
     """
     Enterprise Tool Router with comprehensive validation and audit logging.
@@ -20,6 +71,24 @@ class ToolRouter:
             "schedule_meeting": self.email_tools.schedule_meeting,
             "create_task": self.email_tools.create_task
         }
+        self.refresh_schemas()
+    
+    def refresh_schemas(self) -> None:
+        """Rebuild the cached tool list and per-tool schema lookup from EmailTools."""
+        self._tools_cache = self.email_tools.get_available_tools()
+        self._tool_by_name = {tool["name"]: tool for tool in self._tools_cache}
+        self._schema_by_name = {name: tool["input_schema"] for name, tool in self._tool_by_name.items()}
+        # Kept beside the schemas rather than in them, since the schemas are sent to the model as-is
+        self._required_by_name = {name: tuple(schema.get("required", ())) for name, schema in self._schema_by_name.items()}
+        self._enum_sets_by_name = {
+            name: {
+                field: frozenset(field_schema["enum"])
+                for field, field_schema in schema.get("properties", {}).items()
+                if "enum" in field_schema
+            }
+            for name, schema in self._schema_by_name.items()
+        }
+        self._validators = {name: _compile_validator(schema) for name, schema in self._schema_by_name.items()}
     
     def route_tool_call(self, tool_name: str, tool_args: Dict[str, Any], email_data: Dict[str, Any], request_id: str) -> Dict[str, Any]:
         """
@@ -35,7 +104,7 @@ class ToolRouter:
             Tool execution result with enterprise metadata
         """
         try:
-            logger.info(f"Routing tool call: {tool_name} with args: {tool_args}")
+            logger.info("Routing tool call: %s with args: %s", tool_name, tool_args)
             
             # Validate tool exists
             if tool_name not in self.tool_handlers:
@@ -64,24 +133,20 @@ class ToolRouter:
             # Add enterprise metadata
             result["request_id"] = request_id
             result["tool_name"] = tool_name
-            result["email_context"] = {
-                "subject": email_data.get("subject", ""),
-                "sender": email_data.get("sender", ""),
-                "user_id": email_data.get("user_id", "anonymous")
-            }
+            result["email_context"] = _email_context(email_data)
             
-            logger.info(f"Tool execution completed: {tool_name}")
+            logger.info("Tool execution completed: %s", tool_name)
             return result
             
         except TypeError as e:
-            logger.error(f"Type error in tool call {tool_name}: {str(e)}")
+            logger.error("Type error in tool call %s: %s", tool_name, e)
             return {
                 "status": "error",
                 "message": f"Invalid arguments for {tool_name}: {str(e)}",
                 "request_id": request_id
             }
         except Exception as e:
-            logger.error(f"Error executing tool {tool_name}: {str(e)}")
+            logger.error("Error executing tool %s: %s", tool_name, e)
             return {
                 "status": "error",
                 "message": f"Tool execution failed: {str(e)}",
@@ -99,71 +164,70 @@ class ToolRouter:
         Returns:
             Validation result with detailed error information
         """
-        try:
-            # Get tool schema
-            tools = self.email_tools.get_available_tools()
-            tool_schema = None
-            
-            for tool in tools:
-                if tool["name"] == tool_name:
-                    tool_schema = tool["input_schema"]
-                    break
-            
-            if not tool_schema:
-                return {
-                    "status": "error",
-                    "message": f"No schema found for tool: {tool_name}",
-                    "errors": []
-                }
-            
-            # Check required fields
-            required_fields = tool_schema.get("required", [])
-            missing_fields = []
-            
-            for field in required_fields:
-                if field not in tool_args or tool_args[field] is None or tool_args[field] == "":
-                    missing_fields.append(field)
-            
-            if missing_fields:
+        # Get tool schema
+        tool_schema = self._schema_by_name.get(tool_name)
+        
+        if not tool_schema:
+            return {
+                "status": "error",
+                "message": f"No schema found for tool: {tool_name}",
+                "errors": []
+            }
+        
+        # Check required fields, stopping at the first one missing; the full
+        # list for the error message is only collected once the call has failed
+        required_fields = self._required_by_name[tool_name]
+        
+        for field in required_fields:
+            value = tool_args.get(field)
+            if value is None or value == "":
+                missing_fields = [
+                    field for field in required_fields
+                    if tool_args.get(field) is None or tool_args.get(field) == ""
+                ]
                 return {
                     "status": "error",
                     "message": f"Missing required fields for {tool_name}: {', '.join(missing_fields)}",
                     "errors": [{"field": field, "error": "required"} for field in missing_fields]
                 }
-            
-            # Validate field types and constraints
-            properties = tool_schema.get("properties", {})
-            validation_errors = []
-            
-            for field, value in tool_args.items():
-                if field in properties:
-                    field_schema = properties[field]
-                    field_validation = self._validate_field(field, value, field_schema)
-                    if field_validation["status"] != "valid":
-                        validation_errors.append({
-                            "field": field,
-                            "error": field_validation["message"],
-                            "value": value
-                        })
-            
-            if validation_errors:
-                return {
-                    "status": "error",
-                    "message": f"Validation errors for {tool_name}",
-                    "errors": validation_errors
-                }
-            
-            return {"status": "valid"}
-            
-        except Exception as e:
-            logger.error(f"Error validating tool args: {str(e)}")
+        
+        # Compiled validator accepts the common valid case; rejections fall
+        # through to the field-by-field checks for detailed error messages
+        validator = self._validators.get(tool_name)
+        if validator is not None:
+            try:
+                validator(tool_args)
+                return {"status": "valid"}
+            except fastjsonschema.JsonSchemaException:
+                pass
+        
+        # Validate field types and constraints
+        properties = tool_schema.get("properties", {})
+        enum_sets = self._enum_sets_by_name[tool_name]
+        validation_errors = []
+        
+        for field, value in tool_args.items():
+            if field in properties:
+                field_schema = properties[field]
+                field_validation = self._validate_field(field, value, field_schema, enum_sets.get(field))
+                if field_validation["status"] != "valid":
+                    validation_errors.append({
+                        "field": field,
+                        "error": field_validation["message"],
+                        "value": value
+                    })
+        
+        if validation_errors:
             return {
                 "status": "error",
-                "message": f"Validation error: {str(e)}",
-                "errors": []
+                "message": f"Validation errors for {tool_name}",
+                "errors": validation_errors
             }
+        
+        return {"status": "valid"}
     
-    def _validate_field(self, field_name: str, value: Any, field_schema: Dict[str, Any]) -> Dict[str, Any]:
+    def _validate_field(self, field_name: str, value: Any, field_schema: Dict[str, Any],
+                        enum_set: Optional[FrozenSet[Any]] = None) -> Dict[str, Any]:
         """
         Validate individual field against enterprise schema.
         
@@ -171,74 +235,57 @@ class ToolRouter:
             field_name: Name of the field
             value: Value to validate
             field_schema: Schema for the field
+            enum_set: Precomputed set of the field's enum values, if any
             
         Returns:
             Validation result
         """
-        try:
-            # Check type
-            expected_type = field_schema.get("type")
-            if expected_type:
-                if expected_type == "string" and not isinstance(value, str):
-                    return {
-                        "status": "error",
-                        "message": f"Field '{field_name}' must be a string"
-                    }
-                elif expected_type == "integer" and not isinstance(value, int):
-                    return {
-                        "status": "error",
-                        "message": f"Field '{field_name}' must be an integer"
-                    }
-                elif expected_type == "array" and not isinstance(value, list):
-                    return {
-                        "status": "error",
-                        "message": f"Field '{field_name}' must be an array"
-                    }
-            
-            # Check enum values
-            enum_values = field_schema.get("enum")
-            if enum_values and value not in enum_values:
-                return {
-                    "status": "error",
-                    "message": f"Field '{field_name}' must be one of: {enum_values}"
-                }
-            
-            # Check minimum/maximum for integers
-            if expected_type == "integer":
-                min_val = field_schema.get("minimum")
-                max_val = field_schema.get("maximum")
-                if min_val is not None and value < min_val:
-                    return {
-                        "status": "error",
-                        "message": f"Field '{field_name}' must be at least {min_val}"
-                    }
-                if max_val is not None and value > max_val:
-                    return {
-                        "status": "error",
-                        "message": f"Field '{field_name}' must be at most {max_val}"
-                    }
-            
-            # Check array constraints
-            if expected_type == "array":
-                min_items = field_schema.get("minItems")
-                if min_items is not None and len(value) < min_items:
-                    return {
-                        "status": "error",
-                        "message": f"Field '{field_name}' must have at least {min_items} items"
-                    }
-            
-            return {"status": "valid"}
-            
-        except Exception as e:
-            logger.error(f"Error validating field {field_name}: {str(e)}")
+        # Check type
+        expected_type = field_schema.get("type")
+        type_check = _TYPE_CHECKS.get(expected_type)
+        if type_check and not type_check[0](value):
             return {
                 "status": "error",
-                "message": f"Field validation error: {str(e)}"
+                "message": f"Field '{field_name}' must be {type_check[1]}"
             }
+        
+        # Check enum values
+        enum_values = field_schema.get("enum")
+        if enum_values and value not in (enum_values if enum_set is None else enum_set):
+            return {
+                "status": "error",
+                "message": f"Field '{field_name}' must be one of: {enum_values}"
+            }
+        
+        # Check minimum/maximum for integers
+        if expected_type == "integer":
+            min_val = field_schema.get("minimum")
+            max_val = field_schema.get("maximum")
+            if min_val is not None and value < min_val:
+                return {
+                    "status": "error",
+                    "message": f"Field '{field_name}' must be at least {min_val}"
+                }
+            if max_val is not None and value > max_val:
+                return {
+                    "status": "error",
+                    "message": f"Field '{field_name}' must be at most {max_val}"
+                }
+        
+        # Check array constraints
+        if expected_type == "array":
+            min_items = field_schema.get("minItems")
+            if min_items is not None and len(value) < min_items:
+                return {
+                    "status": "error",
+                    "message": f"Field '{field_name}' must have at least {min_items} items"
+                }
+        
+        return {"status": "valid"}
     
     def get_available_tools(self) -> List[Dict[str, Any]]:
         """Get list of available tools with their enterprise schemas."""
-        return self.email_tools.get_available_tools()
+        return self._tools_cache
     
     def get_tool_schema(self, tool_name: str) -> Dict[str, Any]:
         """
@@ -250,10 +297,9 @@ class ToolRouter:
         Returns:
             Tool schema or error
         """
-        tools = self.get_available_tools()
-        for tool in tools:
-            if tool["name"] == tool_name:
-                return tool
+        tool = self._tool_by_name.get(tool_name)
+        if tool is not None:
+            return tool
         
         return {
             "status": "error",
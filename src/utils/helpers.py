@@ -1,10 +1,56 @@
 ﻿import os
 import re
 import json
+import time
 from typing import Dict, Any, List, Optional
-from datetime import datetime, timedelta
+from datetime import date as _date, datetime, timedelta
 import boto3
 
+def _stdlib_compact_json_dumps(obj: Any) -> str:
+    # Match orjson's output: raw UTF-8 and no whitespace
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), default=str)
+
+# Faster compact JSON encoding when orjson is installed
+try:
+    import orjson
+    
+    def _compact_json_dumps(obj: Any) -> str:
+        try:
+            return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+        except orjson.JSONEncodeError:
+            # e.g. integers beyond 64 bits, which the stdlib encoder still handles
+            return _stdlib_compact_json_dumps(obj)
+except ImportError:
+    _compact_json_dumps = _stdlib_compact_json_dumps
+
+# Patterns compiled once at import
+_EMAIL_RE = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+_EMAIL_FIND_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b')
+_ATTACHMENT_RE = re.compile(r'attachment', re.IGNORECASE)
+
+# Same inputs strptime("%Y-%m-%d") / strptime("%H:%M") accept, without the locale machinery.
+# Field patterns mirror _strptime.TimeRE (note %d allows a space-padded day).
+_DEFAULT_DATE_FORMAT = "%Y-%m-%d"
+_DEFAULT_TIME_FORMAT = "%H:%M"
+_YMD_RE = re.compile(r"(\d\d\d\d)-(1[0-2]|0[1-9]|[1-9])-(3[01]|[12]\d|0[1-9]|[1-9]| [1-9])")
+_HHMM_RE = re.compile(r"(?:2[0-3]|[01]\d|\d):(?:[0-5]\d|\d)")
+
+# Deployment settings, read once at import (see reload_env)
+_AWS_REGION = os.getenv('AWS_REGION', 'us-east-1')
+_IS_DEVELOPMENT = os.getenv('ENVIRONMENT', 'dev').lower() in ('dev', 'development', 'local')
+_IS_ENTERPRISE_MODE = os.getenv('ENTERPRISE_MODE', 'true').lower() == 'true'
+
+# Characters sanitize_input deletes
+_SANITIZE_TABLE = str.maketrans("", "", "<>\"'")
+
+# Header lines parse_email_content reads, with defaults when absent
+_HEADER_DEFAULTS = {
+    "subject": "No Subject",
+    "from": "Unknown Sender",
+    "to": "Unknown Recipient",
+    "date": "Unknown Date"
+}
+
 def validate_email_format(email: str) -> bool:
     """
     Validate email format using enterprise regex.
@@ -15,10 +61,9 @@ def validate_email_format(email: str) -> bool:
     Returns:
         True if valid enterprise email format
     """
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+    return _EMAIL_RE.match(email) is not None
 
-def validate_date_format(date_str: str, format_str: str = "%Y-%m-%d") -> bool:
+def validate_date_format(date_str: str, format_str: str = _DEFAULT_DATE_FORMAT) -> bool:
     """
     Validate date format for enterprise compliance.
     
@@ -29,13 +74,23 @@ def validate_date_format(date_str: str, format_str: str = "%Y-%m-%d") -> bool:
     Returns:
         True if valid date format
     """
+    if format_str == _DEFAULT_DATE_FORMAT:
+        match = _YMD_RE.fullmatch(date_str)
+        if not match:
+            return False
+        try:
+            _date(int(match[1]), int(match[2]), int(match[3]))
+            return True
+        except ValueError:
+            return False
+    
     try:
         datetime.strptime(date_str, format_str)
         return True
     except ValueError:
         return False
 
-def validate_time_format(time_str: str, format_str: str = "%H:%M") -> bool:
+def validate_time_format(time_str: str, format_str: str = _DEFAULT_TIME_FORMAT) -> bool:
     """
     Validate time format for enterprise scheduling.
     
@@ -46,6 +101,9 @@ def validate_time_format(time_str: str, format_str: str = "%H:%M") -> bool:
     Returns:
         True if valid time format
     """
+    if format_str == _DEFAULT_TIME_FORMAT:
+        return _HHMM_RE.fullmatch(time_str) is not None
+    
     try:
         datetime.strptime(time_str, format_str)
         return True
@@ -67,7 +125,7 @@ def sanitize_input(text: str, max_length: int = 1000) -> str:
         return ""
     
     # Remove potentially harmful characters
-    sanitized = re.sub(r'[<>"\']', '', text)
+    sanitized = text.translate(_SANITIZE_TABLE)
     
     # Truncate if too long
     if len(sanitized) > max_length:
@@ -85,23 +143,29 @@ def extract_email_addresses(text: str) -> List[str]:
     Returns:
         List of email addresses found
     """
-    pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-    return re.findall(pattern, text)
+    return _EMAIL_FIND_RE.findall(text)
+
+# (epoch second, ISO string) of the last "now" timestamp, reused within the same second
+_now_timestamp = (0, "")
 
 def format_timestamp(timestamp: Optional[datetime] = None) -> str:
     """
     Format timestamp for enterprise consistency.
     
     Args:
-        timestamp: Timestamp to format (defaults to now)
+        timestamp: Timestamp to format (defaults to now, at one-second resolution)
         
     Returns:
         Formatted timestamp string
     """
-    if timestamp is None:
-        timestamp = datetime.utcnow()
+    global _now_timestamp
+    if timestamp is not None:
+        return timestamp.isoformat()
     
-    return timestamp.isoformat()
+    now = int(time.time())
+    if now != _now_timestamp[0]:
+        _now_timestamp = (now, datetime.utcfromtimestamp(now).isoformat())
+    return _now_timestamp[1]
 
 def parse_email_content(email_text: str) -> Dict[str, Any]:
     """
@@ -114,38 +178,37 @@ def parse_email_content(email_text: str) -> Dict[str, Any]:
         Parsed email information with enterprise metadata
     """
     try:
-        # Extract subject (look for Subject: line)
-        subject_match = re.search(r'Subject:\s*(.+)', email_text, re.IGNORECASE)
-        subject = subject_match.group(1).strip() if subject_match else "No Subject"
-        
-        # Extract sender (look for From: line)
-        from_match = re.search(r'From:\s*(.+)', email_text, re.IGNORECASE)
-        sender = from_match.group(1).strip() if from_match else "Unknown Sender"
+        # Headers end at the first blank line; only that block is scanned
+        header_block, separator, rest = email_text.partition("\n\n")
         
-        # Extract recipient (look for To: line)
-        to_match = re.search(r'To:\s*(.+)', email_text, re.IGNORECASE)
-        recipient = to_match.group(1).strip() if to_match else "Unknown Recipient"
-        
-        # Extract date (look for Date: line)
-        date_match = re.search(r'Date:\s*(.+)', email_text, re.IGNORECASE)
-        date = date_match.group(1).strip() if date_match else "Unknown Date"
+        headers = dict(_HEADER_DEFAULTS)
+        seen = set()
+        for line in header_block.splitlines():
+            name, colon, value = line.partition(":")
+            key = name.strip().lower()
+            value = value.strip()
+            # First non-empty occurrence of each header wins
+            if colon and value and key in headers and key not in seen:
+                headers[key] = value
+                seen.add(key)
         
         # Extract body (everything after headers)
-        body_match = re.search(r'\n\n(.+)', email_text, re.DOTALL)
-        body = body_match.group(1).strip() if body_match else email_text
+        body = rest.strip() if separator and rest else email_text
         
+        sender = headers["from"]
+        recipient = headers["to"]
         return {
-            "subject": subject,
+            "subject": headers["subject"],
             "sender": sender,
             "recipient": recipient,
-            "date": date,
+            "date": headers["date"],
             "body": body,
             "sender_emails": extract_email_addresses(sender),
             "recipient_emails": extract_email_addresses(recipient),
             "enterprise_metadata": {
                 "parsed_at": format_timestamp(),
                 "content_length": len(email_text),
-                "has_attachments": "attachment" in email_text.lower()
+                "has_attachments": _ATTACHMENT_RE.search(email_text) is not None
             }
         }
         
@@ -201,7 +264,23 @@ def safe_json_loads(json_str: str, default: Any = None) -> Any:
 
 def safe_json_dumps(obj: Any, default: str = "{}") -> str:
     """
-    Safely serialize object to JSON for enterprise use.
+    Safely serialize object to compact JSON for enterprise use.
+    
+    Args:
+        obj: Object to serialize
+        default: Default string if serialization fails
+        
+    Returns:
+        JSON string or default
+    """
+    try:
+        return _compact_json_dumps(obj)
+    except (TypeError, ValueError):
+        return default
+
+def safe_json_dumps_pretty(obj: Any, default: str = "{}") -> str:
+    """
+    Safely serialize object to indented JSON for human-facing output.
     
     Args:
         obj: Object to serialize
@@ -222,7 +301,7 @@ def get_aws_region() -> str:
     Returns:
         AWS region string
     """
-    return os.getenv('AWS_REGION', 'us-east-1')
+    return _AWS_REGION
 
 def is_development() -> bool:
     """
@@ -231,7 +310,7 @@ def is_development() -> bool:
     Returns:
         True if development environment
     """
-    return os.getenv('ENVIRONMENT', 'dev').lower() in ['dev', 'development', 'local']
+    return _IS_DEVELOPMENT
 
 def is_enterprise_mode() -> bool:
     """
@@ -240,4 +319,15 @@ def is_enterprise_mode() -> bool:
     Returns:
         True if enterprise mode
     """
-    return os.getenv('ENTERPRISE_MODE', 'true').lower() == 'true'
+    return _IS_ENTERPRISE_MODE
+
+def reload_env() -> None:
+    """
+    Re-read the deployment settings from the environment.
+    
+    Only needed when the environment changes after import (e.g. in tests).
+    """
+    global _AWS_REGION, _IS_DEVELOPMENT, _IS_ENTERPRISE_MODE
+    _AWS_REGION = os.getenv('AWS_REGION', 'us-east-1')
+    _IS_DEVELOPMENT = os.getenv('ENVIRONMENT', 'dev').lower() in ('dev', 'development', 'local')
+    _IS_ENTERPRISE_MODE = os.getenv('ENTERPRISE_MODE', 'true').lower() == 'true'
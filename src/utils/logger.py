@@ -1,8 +1,40 @@
-﻿import logging
+﻿import atexit
+import logging
+import logging.handlers
 import os
+import queue
 import sys
 from typing import Optional
 
+# Records are queued by the caller and written to stdout by a background listener.
+# Off by default inside Lambda, where the sandbox can freeze before queued lines are written.
+_ASYNC_LOGGING = os.getenv(
+    'LOG_ASYNC', 'false' if os.getenv('AWS_LAMBDA_FUNCTION_NAME') else 'true'
+).lower() == 'true'
+
+# Environment log level and the shared enterprise formatter, resolved once at import
+_DEFAULT_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+_FORMATTER = logging.Formatter(
+    '%(asctime)s - %(name)s - %(levelname)s - [ENTERPRISE] - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+
+_log_queue: Optional[queue.SimpleQueue] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+
+def _get_log_queue() -> queue.SimpleQueue:
+    """Return the shared log queue, starting its stdout listener on first use."""
+    global _log_queue, _listener
+    if _listener is None:
+        stream_handler = logging.StreamHandler(sys.stdout)
+        stream_handler.setFormatter(_FORMATTER)
+        _log_queue = queue.SimpleQueue()
+        _listener = logging.handlers.QueueListener(_log_queue, stream_handler)
+        _listener.start()
+        # Drain anything still queued at interpreter exit
+        atexit.register(_listener.stop)
+    return _log_queue
+
 def setup_logger(name: str, level: Optional[str] = None) -> logging.Logger:
     """
     Set up enterprise logger with consistent formatting.
@@ -15,26 +47,23 @@ def setup_logger(name: str, level: Optional[str] = None) -> logging.Logger:
         Configured enterprise logger
     """
     # Get log level from environment or parameter
-    log_level = level or os.getenv('LOG_LEVEL', 'INFO').upper()
+    log_level = getattr(logging, level or _DEFAULT_LEVEL, logging.INFO)
     
     # Create logger
     logger = logging.getLogger(name)
-    logger.setLevel(getattr(logging, log_level, logging.INFO))
+    logger.setLevel(log_level)
     
     # Avoid duplicate handlers
     if logger.handlers:
         return logger
     
-    # Create console handler
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(getattr(logging, log_level, logging.INFO))
-    
-    # Create enterprise formatter
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - [ENTERPRISE] - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    console_handler.setFormatter(formatter)
+    # Create console handler (queued to the background writer, or direct)
+    if _ASYNC_LOGGING:
+        console_handler = logging.handlers.QueueHandler(_get_log_queue())
+    else:
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(_FORMATTER)
+    console_handler.setLevel(log_level)
     
     # Add handler to logger
     logger.addHandler(console_handler)
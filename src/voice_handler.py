@@ -5,8 +5,10 @@ Provides hands free email editing through speech to text functionality
 import json
 import logging
 import os
+import re
 import sys
-from typing import Dict, Any, Optional
+from datetime import datetime
+from typing import Dict, Any, List, Optional
 
 # Handle import for both Lambda and local execution
 try:
@@ -17,6 +19,55 @@ except ImportError:
     logging.basicConfig(level=logging.INFO)
     logger = logging.getLogger(__name__)
 
+# Simple tone adjustments: whole-word, case-insensitive replacements
+_TONE_MAPPING = {
+    'formal': {
+        'hi': 'Dear',
+        'hello': 'Dear',
+        'thanks': 'Thank you',
+        'yeah': 'Yes',
+        'yea': 'Yes'
+    },
+    'friendly': {
+        'dear': 'Hi',
+        'thank you': 'Thanks',
+        'sincerely': 'Best regards'
+    }
+}
+
+# One alternation per tone so each adjustment is a single pass over the content
+_TONE_PATTERNS = {
+    tone: re.compile(
+        r'\b(?:' + '|'.join(re.escape(word) for word in sorted(mapping, key=len, reverse=True)) + r')\b',
+        re.IGNORECASE
+    )
+    for tone, mapping in _TONE_MAPPING.items()
+}
+
+# Voice command keywords -> edit they trigger, all found in one scan of the transcription.
+# When several are present the earliest edit in _COMMAND_PRIORITY wins; the text after
+# that edit's first keyword is its payload.
+_VOICE_COMMANDS = {
+    'change tone': 'tone',
+    'make it': 'tone',
+    'change subject to': 'subject',
+    'change subject': 'subject',
+    'subject to': 'subject',
+    'add': 'add',
+    'include': 'add',
+    'remove': 'remove',
+    'delete': 'remove'
+}
+_COMMAND_PRIORITY = ('tone', 'subject', 'add', 'remove')
+_COMMAND_RE = re.compile(
+    r'\b(?:' + '|'.join(re.escape(keyword) for keyword in sorted(_VOICE_COMMANDS, key=len, reverse=True)) + r')\b',
+    re.IGNORECASE
+)
+
+# Quoted text in a command, double quotes preferred
+_DOUBLE_QUOTED_RE = re.compile(r'"([^"]*)"')
+_SINGLE_QUOTED_RE = re.compile(r"'([^']*)'")
+
 class VoiceHandler:
     """
     Handles voice to text conversion for email editing workflows.
@@ -48,12 +99,13 @@ class VoiceHandler:
         """
         try:
             transcription = voice_data.get('transcription', '')
+            transcription_lower = voice_data.get('transcription_lower')  # set by callers that already case-folded
             edit_type = voice_data.get('edit_type', 'replace')  # replace, append, modify
             
-            logger.info(f"Processing voice edit: {edit_type} - {transcription[:50]}...ขั้น")
+            logger.info("Processing voice edit: %s - %s...ขั้น", edit_type, transcription[:50])
             
             # Parse voice command
-            edit_result = self._parse_voice_command(transcription, email_draft, edit_type)
+            edit_result = self._parse_voice_command(transcription, email_draft, edit_type, transcription_lower)
             
             return {
                 "status": "success",
@@ -65,14 +117,47 @@ class VoiceHandler:
             }
             
         except Exception as e:
-            logger.error(f"Error processing voice edit: {str(e)}")
+            logger.error("Error processing voice edit: %s", e)
             return {
                 "status": "error",
                 "message": f"Voice edit processing failed: {str(e)}",
                 "original_draft": email_draft
             }
     
-    def _parse_voice_command(self, transcription: str, email_draft: Dict[str, Any], edit_type: str) -> Dict[str, Any]:
+    def process_voice_edit_batch(self, edits: List[Dict[str, Any]], email_draft: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Apply several voice edits, in order, in a single call.
+        
+        Args:
+            edits: Voice inputs, oldest first
+            email_draft: Draft the first edit applies to
+            
+        Returns:
+            Result for the final draft, plus every intermediate draft so each
+            edit can still be undone individually
+        """
+        current = email_draft
+        intermediate_drafts = []
+        
+        for voice_data in edits:
+            result = self.process_voice_edit(voice_data, current)
+            if result['status'] != 'success':
+                result['intermediate_drafts'] = intermediate_drafts
+                return result
+            current = result['edited_draft']
+            intermediate_drafts.append(current)
+        
+        return {
+            "status": "success",
+            "original_draft": email_draft,
+            "edited_draft": current,
+            "intermediate_drafts": intermediate_drafts,
+            "voice_commands": [voice_data.get('transcription', '') for voice_data in edits],
+            "edit_count": len(intermediate_drafts)
+        }
+    
+    def _parse_voice_command(self, transcription: str, email_draft: Dict[str, Any], edit_type: str,
+                             transcription_lower: Optional[str] = None) -> Dict[str, Any]:
         """
         Parse voice command and apply to email draft.
         
@@ -83,95 +168,81 @@ class VoiceHandler:
         - "Change subject to [text]"
         - "Make it more [urgent/professional/friendly]"
         """
-        transcription_lower = transcription.lower()
-        updated_draft = email_draft.copy()
+        if transcription_lower is None:
+            transcription_lower = transcription.casefold()
+        # Copy only the nested draft we edit, so the caller's draft is never mutated
+        draft = dict(email_draft['draft'])
+        updated_draft = {**email_draft, 'draft': draft}
         
         # Extract current content
-        current_content = updated_draft.get('draft', {}).get('content', '')
-        current_tone = updated_draft.get('draft', {}).get('tone', 'neutral')
+        current_content = draft.get('content', '')
         
-        # Voice command patterns
-        if 'change tone' in transcription_lower or 'make it' in transcription_lower:
+        # Voice command patterns: where each edit's first keyword ends in the original
+        # transcription (matched case-insensitively, so offsets line up with it)
+        keyword_ends = {}
+        for match in _COMMAND_RE.finditer(transcription):
+            keyword_ends.setdefault(_VOICE_COMMANDS[match.group(0).lower()], match.end())
+        command = next((name for name in _COMMAND_PRIORITY if name in keyword_ends), None)
+        
+        if command == 'tone':
             # Tone changes
             if 'formal' in transcription_lower:
-                updated_draft['draft']['tone'] = 'formal'
-                updated_draft['draft']['content'] = self._adjust_tone(current_content, 'formal')
+                draft['tone'] = 'formal'
+                draft['content'] = self._adjust_tone(current_content, 'formal')
             elif 'friendly' in transcription_lower:
-                updated_draft['draft']['tone'] = 'friendly'
-                updated_draft['draft']['content'] = self._adjust_tone(current_content, 'friendly')
+                draft['tone'] = 'friendly'
+                draft['content'] = self._adjust_tone(current_content, 'friendly')
             elif 'urgent' in transcription_lower:
-                updated_draft['draft']['urgency'] = 'high'
+                draft['urgency'] = 'high'
         
-        elif 'change subject' in transcription_lower or 'subject to' in transcription_lower:
+        elif command == 'subject':
             # Subject changes
-            new_subject = self._extract_quoted_text(transcription) or transcription.split('subject to')[-1].strip()
-            updated_draft['draft']['subject'] = new_subject
+            new_subject = self._extract_quoted_text(transcription) or transcription[keyword_ends['subject']:].strip()
+            draft['subject'] = new_subject
         
-        elif 'add' in transcription_lower or 'include' in transcription_lower:
+        elif command == 'add':
             # Additions
-            text_to_add = transcription.split('add', 1)[-1].split('include', 1)[-1].strip()
+            text_to_add = transcription[keyword_ends['add']:].strip()
             if text_to_add:
-                updated_draft['draft']['content'] = f"{current_content}\n\n{text_to_add}"
+                draft['content'] = f"{current_content}\n\n{text_to_add}"
         
-        elif 'remove' in transcription_lower or 'delete' in transcription_lower:
+        elif command == 'remove':
             # Removals
-            text_to_remove = transcription.split('remove', 1)[-1].split('delete', 1)[-1].strip()
+            text_to_remove = transcription[keyword_ends['remove']:].strip()
             if text_to_remove and text_to_remove in current_content:
-                updated_draft['draft']['content'] = current_content.replace(text_to_remove, '')
+                draft['content'] = current_content.replace(text_to_remove, '')
         
         elif edit_type == 'replace':
             # Full replacement
-            updated_draft['draft']['content'] = transcription
+            draft['content'] = transcription
         
         elif edit_type == 'append':
             # Append to existing
-            updated_draft['draft']['content'] = f"{current_content}\n\n{transcription}"
+            draft['content'] = f"{current_content}\n\n{transcription}"
         
         else:
             # Default: append
-            updated_draft['draft']['content'] = f"{current_content}\n\n{transcription}"
+            draft['content'] = f"{current_content}\n\n{transcription}"
         
         # Update timestamp
-        from datetime import datetime
-        updated_draft['draft']['last_edited'] = datetime.utcnow().isoformat()
-        updated_draft['draft']['edited_via'] = 'voice'
+        draft['last_edited'] = datetime.utcnow().isoformat()
+        draft['edited_via'] = 'voice'
         
         return updated_draft
     
     def _adjust_tone(self, content: str, new_tone: str) -> str:
         """Adjust email tone while preserving content."""
-        # Simple tone adjustments
-        tone_mapping = {
-            'formal': {
-                'hi': 'Dear',
-                'hello': 'Dear',
-                'thanks': 'Thank you',
-                'yeah': 'Yes',
-                'yea': 'Yes'
-            },
-            'friendly': {
-                'dear': 'Hi',
-                'thank you': 'Thanks',
-                'sincerely': 'Best regards'
-            }
-        }
-        
-        if new_tone in tone_mapping:
-            adjusted = content
-            for old, new in tone_mapping[new_tone].items():
-                adjusted = adjusted.replace(old, new)
-            return adjusted
+        pattern = _TONE_PATTERNS.get(new_tone)
+        if pattern is None:
+            return content
         
-        return content
+        mapping = _TONE_MAPPING[new_tone]
+        return pattern.sub(lambda match: mapping[match.group(0).lower()], content)
     
     def _extract_quoted_text(self, text: str) -> Optional[str]:
         """Extract text within quotes."""
-        import re
-        matches = re.findall(r'"([^"]*)"', text)
-        if matches:
-            return matches[0]
-        matches = re.findall(r"'([^']*)'", text)
-        if matches:
-            return matches[0]
+        match = _DOUBLE_QUOTED_RE.search(text) or _SINGLE_QUOTED_RE.search(text)
+        if match:
+            return match.group(1)
         return None
 
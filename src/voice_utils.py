@@ -3,8 +3,28 @@ Utility functions for voice interaction
 Supports both Google Speech Recognition (demo) and AWS Transcribe (production)
 """
 import os
+import json
+import math
+import asyncio
+import hashlib
+import itertools
+import queue
+import socket
 import logging
-from typing import Optional, Tuple
+import struct
+import sys
+import tempfile
+import threading
+import time
+import uuid
+import wave
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
 
 # Try to import speech_recognition for local demo
 try:
@@ -15,45 +35,449 @@ except ImportError:
     print("⚠️  speech_recognition not installed. Voice features will use fallback mode.")
     print("   Install with: pip install speechrecognition pyaudio")
 
+# Faster parsing of downloaded transcript JSON (falls back to the standard library)
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# audioop is used for frame energy when capturing into a preallocated buffer
+try:
+    import audioop
+except ImportError:
+    audioop = None
+
+# Optional WebRTC voice activity detection to end phrases (VOICE_VAD=true)
+try:
+    import webrtcvad
+    WEBRTCVAD_AVAILABLE = True
+except ImportError:
+    WEBRTCVAD_AVAILABLE = False
+
+_VAD_ENABLED = WEBRTCVAD_AVAILABLE and os.environ.get('VOICE_VAD', 'false').lower() == 'true'
+_VAD_MODE = int(os.environ.get('VOICE_VAD_MODE', '2'))  # 0 (least) to 3 (most aggressive)
+_VAD_SAMPLE_RATE = 16000  # webrtcvad accepts 8/16/32/48 kHz 16-bit mono
+_VAD_SAMPLE_RATES = (8000, 16000, 32000, 48000)
+_VAD_FRAME_MS = 20
+_VAD_ONSET_MS = 300  # audio kept from before speech starts
+
+# Optional on-device recognizer: used when Google is unreachable, or always when offline
+try:
+    import vosk
+    VOSK_AVAILABLE = True
+except ImportError:
+    VOSK_AVAILABLE = False
+
+_OFFLINE = os.environ.get('EMAIL_ASSISTANT_OFFLINE', 'false').lower() in ('1', 'true')
+
+# Upper bound on each Google Speech Recognition request
+_RECOGNITION_TIMEOUT = float(os.environ.get('SPEECH_RECOGNITION_TIMEOUT', '3'))
+_VOSK_SAMPLE_RATE = 16000
+
+# Audio goes to the recognizers (and to S3 for Transcribe) as 16-bit mono PCM at no more than 16 kHz
+_SPEECH_SAMPLE_RATE = 16000
+_SPEECH_SAMPLE_WIDTH = 2
+
+# Optional Transcribe streaming SDK for transcribing audio as it is captured
+try:
+    from amazon_transcribe.client import TranscribeStreamingClient
+    from amazon_transcribe.handlers import TranscriptResultStreamHandler
+    TRANSCRIBE_STREAMING_AVAILABLE = True
+    
+    class _TranscriptCollector(TranscriptResultStreamHandler):
+        """Collects final transcript segments, reporting interim ones to a callback"""
+        
+        def __init__(self, output_stream, on_partial: Optional[Callable[[str], None]] = None):
+            super().__init__(output_stream)
+            self.segments: List[str] = []
+            self.on_partial = on_partial
+        
+        async def handle_transcript_event(self, transcript_event):
+            for result in transcript_event.transcript.results:
+                if not result.alternatives:
+                    continue
+                transcript = result.alternatives[0].transcript
+                if not result.is_partial:
+                    self.segments.append(transcript)
+                elif self.on_partial is not None:
+                    self.on_partial(" ".join([*self.segments, transcript]))
+except ImportError:
+    TRANSCRIBE_STREAMING_AVAILABLE = False
+
 # Setup logging
 logger = logging.getLogger(__name__)
 
-def setup_microphone() -> Tuple[Optional[any], Optional[any]]:
+# Status lines ([Listening], [OK], ...) are printed for someone at a terminal; server
+# processes rely on the logger alone. VOICE_VERBOSE=1/0 overrides the terminal check.
+_VERBOSE = os.environ.get('VOICE_VERBOSE', '1' if sys.stdout.isatty() else '0') == '1'
+
+def _status(message: str):
+    """Print a user-facing status line when running verbosely"""
+    if _VERBOSE:
+        print(message)
+
+# Ambient noise calibration is reused across runs for a day
+_CALIBRATION_CACHE_PATH = os.path.expanduser(
+    os.environ.get('VOICE_CALIBRATION_CACHE', '~/.cache/email_assistant/energy_threshold.json')
+)
+_CALIBRATION_MAX_AGE = 24 * 60 * 60  # seconds
+
+def _load_energy_threshold() -> Optional[float]:
+    """Energy threshold from the last calibration, if it is recent enough"""
+    try:
+        with open(_CALIBRATION_CACHE_PATH) as cache_file:
+            cached = json.load(cache_file)
+        if time.time() - cached['ts'] < _CALIBRATION_MAX_AGE:
+            return float(cached['threshold'])
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+def _save_energy_threshold(threshold: float):
+    """Remember a calibration for later runs (best effort)"""
+    try:
+        os.makedirs(os.path.dirname(_CALIBRATION_CACHE_PATH), exist_ok=True)
+        with open(_CALIBRATION_CACHE_PATH, 'w') as cache_file:
+            json.dump({"threshold": threshold, "ts": time.time()}, cache_file)
+    except OSError as e:
+        logger.debug(f"Could not cache microphone calibration: {e}")
+
+# (recognizer, microphone) from the first successful setup, shared by later callers
+_microphone: Optional[Tuple[Any, Any]] = None
+_microphone_lock = threading.Lock()
+
+def setup_microphone(recalibrate: bool = False) -> Tuple[Optional[any], Optional[any]]:
     """
     Initialize microphone for speech recognition
     
+    The recognizer and microphone are created and calibrated once per
+    process; later calls return the same pair (see reset_microphone).
+    
+    Args:
+        recalibrate: Set up afresh and measure ambient noise, ignoring both caches
+        
     Returns:
         Tuple of (recognizer, microphone) or (None, None) if setup fails
     """
+    global _microphone
     if not SPEECH_RECOGNITION_AVAILABLE:
         logger.warning("SpeechRecognition not available")
         return None, None
     
+    with _microphone_lock:
+        if _microphone is None or recalibrate:
+            recognizer, microphone = _create_microphone(recalibrate)
+            if recognizer is None:
+                return None, None
+            _microphone = (recognizer, microphone)
+        return _microphone
+
+def reset_microphone():
+    """Forget the shared microphone, e.g. after the audio device changes"""
+    global _microphone
+    with _microphone_lock:
+        _microphone = None
+
+def _create_microphone(recalibrate: bool) -> Tuple[Optional[any], Optional[any]]:
+    """Create and calibrate a recognizer/microphone pair; (None, None) on failure"""
     try:
         recognizer = sr.Recognizer()
-        microphone = sr.Microphone()
+        microphone = sr.Microphone(sample_rate=_VAD_SAMPLE_RATE) if _VAD_ENABLED else sr.Microphone()
         
-        # Calibrate for ambient noise
-        print("[Calibrating] Calibrating microphone for ambient noise...")
-        with microphone as source:
-            recognizer.adjust_for_ambient_noise(source, duration=1)
+        # Calibrate for ambient noise, unless a recent calibration can be reused
+        energy_threshold = None if recalibrate else _load_energy_threshold()
+        if energy_threshold is not None:
+            # Keep adapting from the cached level as the session goes on
+            recognizer.energy_threshold = energy_threshold
+            recognizer.dynamic_energy_threshold = True
+        else:
+            _status("[Calibrating] Calibrating microphone for ambient noise...")
+            with microphone as source:
+                recognizer.adjust_for_ambient_noise(source, duration=1)
+            _save_energy_threshold(recognizer.energy_threshold)
         
-        print("[OK] Microphone ready")
+        _status("[OK] Microphone ready")
         logger.info("Microphone initialized successfully")
         return recognizer, microphone
         
     except OSError as e:
-        print(f"[ERROR] Microphone not found: {e}")
-        print("   Please check your microphone connection")
+        _status(f"[ERROR] Microphone not found: {e}")
+        _status("   Please check your microphone connection")
         logger.error(f"Microphone setup failed: {e}")
         return None, None
         
     except Exception as e:
-        print(f"[ERROR] Microphone setup failed: {e}")
+        _status(f"[ERROR] Microphone setup failed: {e}")
         logger.error(f"Unexpected error in microphone setup: {e}")
         return None, None
 
-def listen_for_speech(recognizer, microphone, timeout: int = 10, phrase_time_limit: int = 15) -> Optional[str]:
+class AudioBuffer:
+    """
+    Preallocated PCM buffer reused across utterances.
+    Microphone frames are copied into one fixed bytearray instead of being
+    collected as a list of fresh bytes objects and joined per phrase.
+    """
+    
+    def __init__(self, max_seconds: int = 15):
+        self.max_seconds = max_seconds
+        self.sample_rate = 0
+        self.sample_width = 0
+        self.length = 0
+        self._data = bytearray()
+        self._view = memoryview(self._data)
+    
+    def reset(self, sample_rate: int, sample_width: int):
+        """Start a new phrase, growing the buffer only if the format needs more room"""
+        capacity = sample_rate * sample_width * self.max_seconds
+        if capacity > len(self._data):
+            self._view.release()
+            self._data = bytearray(capacity)
+            self._view = memoryview(self._data)
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.length = 0
+    
+    def append(self, frame: bytes) -> bool:
+        """Copy a frame into the buffer; returns False once the buffer is full"""
+        end = self.length + len(frame)
+        if end > len(self._data):
+            return False
+        self._view[self.length:end] = frame
+        self.length = end
+        return True
+    
+    @property
+    def seconds(self) -> float:
+        return self.length / (self.sample_rate * self.sample_width) if self.sample_rate else 0.0
+    
+    def to_audio_data(self):
+        """Snapshot the captured phrase as SpeechRecognition AudioData"""
+        return sr.AudioData(bytes(self._view[:self.length]), self.sample_rate, self.sample_width)
+
+def capture_phrase(recognizer, source, audio_buffer: AudioBuffer, timeout: Optional[float] = None,
+                   phrase_time_limit: Optional[float] = None):
+    """
+    Record one phrase into a preallocated buffer
+    
+    Mirrors Recognizer.listen(): waits for energy above the recognizer's
+    threshold (adapting the threshold to the ambient level meanwhile when
+    dynamic_energy_threshold is set), then records until pause_threshold
+    seconds of silence.
+    
+    Args:
+        recognizer: SpeechRecognition Recognizer object
+        source: Microphone that is already open (inside its context manager)
+        audio_buffer: Buffer to record into
+        timeout: Maximum seconds to wait for speech to start
+        phrase_time_limit: Maximum seconds for a phrase
+        
+    Returns:
+        AudioData for the captured phrase
+    """
+    if audioop is None:
+        return recognizer.listen(source, timeout=timeout, phrase_time_limit=phrase_time_limit)
+    
+    seconds_per_chunk = source.CHUNK / source.SAMPLE_RATE
+    pause_chunks = math.ceil(recognizer.pause_threshold / seconds_per_chunk)
+    audio_buffer.reset(source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+    
+    damping = recognizer.dynamic_energy_adjustment_damping ** seconds_per_chunk
+    
+    # Wait for speech, keeping the previous chunk so the onset is not clipped
+    waited = 0.0
+    previous = b""
+    while True:
+        frame = source.stream.read(source.CHUNK)
+        energy = audioop.rms(frame, source.SAMPLE_WIDTH)
+        if energy > recognizer.energy_threshold:
+            break
+        if recognizer.dynamic_energy_threshold:
+            # Same ambient tracking as Recognizer.listen(), so a stale cached threshold is corrected
+            target_energy = energy * recognizer.dynamic_energy_ratio
+            recognizer.energy_threshold = recognizer.energy_threshold * damping + target_energy * (1 - damping)
+        waited += seconds_per_chunk
+        if timeout and waited > timeout:
+            raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+        previous = frame
+    audio_buffer.append(previous)
+    
+    silent_chunks = 0
+    while audio_buffer.append(frame):
+        if phrase_time_limit and audio_buffer.seconds >= phrase_time_limit:
+            break
+        silent_chunks = silent_chunks + 1 if audioop.rms(frame, source.SAMPLE_WIDTH) <= recognizer.energy_threshold else 0
+        if silent_chunks >= pause_chunks:
+            break
+        frame = source.stream.read(source.CHUNK)
+    
+    return audio_buffer.to_audio_data()
+
+def listen_vad(source, audio_buffer: Optional[AudioBuffer] = None, vad=None, timeout: Optional[float] = None,
+               max_silence_ms: int = 400, max_duration_ms: int = 15000):
+    """
+    Record one phrase, ending it by voice activity detection
+    
+    Unlike the energy threshold, WebRTC VAD tells speech from steady
+    background noise, so the phrase ends max_silence_ms after the speaker
+    stops instead of running on towards the phrase time limit.
+    
+    Args:
+        source: Microphone that is already open, 16-bit mono at a VAD sample rate
+        audio_buffer: Buffer to record into (one is created if omitted)
+        vad: webrtcvad.Vad instance (defaults to VOICE_VAD_MODE aggressiveness)
+        timeout: Maximum seconds to wait for speech to start
+        max_silence_ms: Silence that ends the phrase
+        max_duration_ms: Maximum phrase length
+        
+    Returns:
+        AudioData for the captured phrase
+    """
+    if vad is None:
+        vad = webrtcvad.Vad(_VAD_MODE)
+    if audio_buffer is None:
+        audio_buffer = AudioBuffer(max_seconds=math.ceil(max_duration_ms / 1000) + 1)
+    
+    sample_rate = source.SAMPLE_RATE
+    frame_size = sample_rate * _VAD_FRAME_MS // 1000 * source.SAMPLE_WIDTH
+    audio_buffer.reset(sample_rate, source.SAMPLE_WIDTH)
+    onset = deque(maxlen=_VAD_ONSET_MS // _VAD_FRAME_MS)
+    speaking = False
+    waited_ms = silent_ms = spoken_ms = 0
+    pending = b""
+    
+    while True:
+        pending += source.stream.read(source.CHUNK)
+        whole = len(pending) - len(pending) % frame_size
+        for offset in range(0, whole, frame_size):
+            frame = pending[offset:offset + frame_size]
+            is_speech = vad.is_speech(frame, sample_rate)
+            
+            if not speaking:
+                if not is_speech:
+                    onset.append(frame)
+                    waited_ms += _VAD_FRAME_MS
+                    if timeout and waited_ms > timeout * 1000:
+                        raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+                    continue
+                speaking = True
+                for earlier in onset:
+                    audio_buffer.append(earlier)
+            
+            spoken_ms += _VAD_FRAME_MS
+            silent_ms = 0 if is_speech else silent_ms + _VAD_FRAME_MS
+            if (not audio_buffer.append(frame) or silent_ms >= max_silence_ms
+                    or spoken_ms >= max_duration_ms):
+                return audio_buffer.to_audio_data()
+        pending = pending[whole:]
+
+def _capture_from_source(recognizer, source, timeout: Optional[float], phrase_time_limit: Optional[float],
+                         audio_buffer: Optional[AudioBuffer]):
+    """Record one phrase from an open microphone (raises sr.WaitTimeoutError if none starts)"""
+    if _VAD_ENABLED and source.SAMPLE_RATE in _VAD_SAMPLE_RATES and source.SAMPLE_WIDTH == 2:
+        max_duration_ms = int(phrase_time_limit * 1000) if phrase_time_limit else 15000
+        return listen_vad(source, audio_buffer, timeout=timeout, max_duration_ms=max_duration_ms)
+    if audio_buffer is not None:
+        return capture_phrase(recognizer, source, audio_buffer, timeout, phrase_time_limit)
+    return recognizer.listen(source, timeout=timeout, phrase_time_limit=phrase_time_limit)
+
+def _capture_audio(recognizer, microphone, timeout: Optional[float], phrase_time_limit: Optional[float],
+                   audio_buffer: Optional[AudioBuffer]):
+    """Record one phrase from the microphone (raises sr.WaitTimeoutError if none starts)"""
+    with microphone as source:
+        _status("[Listening] Listening... (speak now)")
+        return _capture_from_source(recognizer, source, timeout, phrase_time_limit, audio_buffer)
+
+@lru_cache(maxsize=1)
+def _get_vosk_model():
+    """Vosk model from VOSK_MODEL_PATH, loaded on first use (None if unavailable)"""
+    model_path = os.environ.get('VOSK_MODEL_PATH')
+    if not (VOSK_AVAILABLE and model_path):
+        return None
+    try:
+        vosk.SetLogLevel(-1)
+        return vosk.Model(model_path)
+    except Exception as e:
+        logger.error(f"Could not load Vosk model from {model_path}: {e}")
+        return None
+
+def _recognize_offline(audio) -> Optional[str]:
+    """
+    Transcribe captured audio on-device with Vosk
+    
+    Returns:
+        Transcribed text ("" if nothing was understood), or None without a model
+    """
+    model = _get_vosk_model()
+    if model is None:
+        return None
+    
+    recognizer = vosk.KaldiRecognizer(model, _VOSK_SAMPLE_RATE)
+    recognizer.AcceptWaveform(audio.get_raw_data(convert_rate=_VOSK_SAMPLE_RATE, convert_width=2))
+    text = json.loads(recognizer.FinalResult()).get('text', '')
+    if text:
+        _status(f"[OK] Heard (on-device): '{text}'")
+        logger.info(f"Speech recognized on-device: {text}")
+    else:
+        _status("[ERROR] Could not understand audio")
+        logger.warning("Speech not understood")
+    return text
+
+def _to_speech_audio(audio):
+    """Captured audio as 16-bit samples at no more than 16 kHz (microphones often record 44.1/48 kHz)"""
+    sample_rate = min(audio.sample_rate, _SPEECH_SAMPLE_RATE)
+    if audio.sample_rate == sample_rate and audio.sample_width == _SPEECH_SAMPLE_WIDTH:
+        return audio
+    return sr.AudioData(
+        audio.get_raw_data(convert_rate=sample_rate, convert_width=_SPEECH_SAMPLE_WIDTH),
+        sample_rate, _SPEECH_SAMPLE_WIDTH
+    )
+
+def _recognize_google(recognizer, audio, **kwargs):
+    """
+    recognize_google with the request bounded by SPEECH_RECOGNITION_TIMEOUT
+    (unless the recognizer already sets its own operation_timeout); a timeout
+    is reported as sr.RequestError like any other service failure.
+    Audio is sent at 16 kHz rather than the microphone's native rate.
+    """
+    if getattr(recognizer, 'operation_timeout', None) is None:
+        recognizer.operation_timeout = _RECOGNITION_TIMEOUT
+    try:
+        return recognizer.recognize_google(_to_speech_audio(audio), **kwargs)
+    except socket.timeout as e:
+        raise sr.RequestError(f"recognition request timed out: {e}")
+
+def _recognize_audio(recognizer, audio) -> Optional[str]:
+    """Transcribe captured audio; "" if it wasn't understood, None on service errors"""
+    _status("[Processing] Processing speech...")
+    
+    if _OFFLINE:
+        text = _recognize_offline(audio)
+        if text is not None:
+            return text
+    
+    # Try Google Speech Recognition first (free, no API key needed)
+    try:
+        text = _recognize_google(recognizer, audio)
+        _status(f"[OK] Heard: '{text}'")
+        logger.info(f"Speech recognized: {text}")
+        return text
+    except sr.UnknownValueError:
+        _status("[ERROR] Could not understand audio")
+        logger.warning("Speech not understood")
+        return ""
+    except sr.RequestError as e:
+        _status(f"[ERROR] Speech service error: {e}")
+        logger.error(f"Speech recognition service error: {e}")
+        if not _OFFLINE:
+            text = _recognize_offline(audio)
+            if text is not None:
+                logger.info("Used on-device recognizer after speech service error")
+                return text
+        return None
+
+def listen_for_speech(recognizer, microphone, timeout: int = 10, phrase_time_limit: int = 15,
+                      audio_buffer: Optional[AudioBuffer] = None) -> Optional[str]:
     """
     Listen for speech and return transcribed text
     
@@ -62,6 +486,7 @@ def listen_for_speech(recognizer, microphone, timeout: int = 10, phrase_time_lim
         microphone: SpeechRecognition Microphone object
         timeout: Maximum seconds to wait for speech to start
         phrase_time_limit: Maximum seconds for a phrase
+        audio_buffer: Optional preallocated buffer to capture into
         
     Returns:
         Transcribed text or None if failed
@@ -72,38 +497,59 @@ def listen_for_speech(recognizer, microphone, timeout: int = 10, phrase_time_lim
         return input("You: ").strip()
     
     try:
-        with microphone as source:
-            print("[Listening] Listening... (speak now)")
-            audio = recognizer.listen(source, timeout=timeout, phrase_time_limit=phrase_time_limit)
+        audio = _capture_audio(recognizer, microphone, timeout, phrase_time_limit, audio_buffer)
+        return _recognize_audio(recognizer, audio)
+            
+    except sr.WaitTimeoutError:
+        _status("[Timeout] No speech detected (timeout)")
+        logger.info("Speech timeout")
+        return None
         
-        print("[Processing] Processing speech...")
+    except Exception as e:
+        _status(f"[ERROR] Speech recognition error: {e}")
+        logger.error(f"Unexpected error in speech recognition: {e}")
+        return None
+
+async def listen_for_speech_async(recognizer, microphone, timeout: int = 10, phrase_time_limit: int = 15,
+                                  audio_buffer: Optional[AudioBuffer] = None) -> Optional[str]:
+    """
+    listen_for_speech for callers running an event loop
+    
+    Capture and the Google Speech Recognition request run in worker threads,
+    so the loop keeps serving other work meanwhile.
+    
+    Args:
+        recognizer: SpeechRecognition Recognizer object
+        microphone: SpeechRecognition Microphone object
+        timeout: Maximum seconds to wait for speech to start
+        phrase_time_limit: Maximum seconds for a phrase
+        audio_buffer: Optional preallocated buffer to capture into
         
-        # Try Google Speech Recognition first (free, no API key needed)
-        try:
-            text = recognizer.recognize_google(audio)
-            print(f"[OK] Heard: '{text}'")
-            logger.info(f"Speech recognized: {text}")
-            return text
-        except sr.UnknownValueError:
-            print("[ERROR] Could not understand audio")
-            logger.warning("Speech not understood")
-            return ""
-        except sr.RequestError as e:
-            print(f"[ERROR] Speech service error: {e}")
-            logger.error(f"Speech recognition service error: {e}")
-            return None
+    Returns:
+        Transcribed text or None if failed
+    """
+    if not SPEECH_RECOGNITION_AVAILABLE or not recognizer or not microphone:
+        # Fallback to text input
+        print("[Voice Input] Voice input (type your command):")
+        return (await asyncio.to_thread(input, "You: ")).strip()
+    
+    try:
+        audio = await asyncio.to_thread(_capture_audio, recognizer, microphone, timeout, phrase_time_limit,
+                                        audio_buffer)
+        return await asyncio.to_thread(_recognize_audio, recognizer, audio)
             
     except sr.WaitTimeoutError:
-        print("[Timeout] No speech detected (timeout)")
+        _status("[Timeout] No speech detected (timeout)")
         logger.info("Speech timeout")
         return None
         
     except Exception as e:
-        print(f"[ERROR] Speech recognition error: {e}")
+        _status(f"[ERROR] Speech recognition error: {e}")
         logger.error(f"Unexpected error in speech recognition: {e}")
         return None
 
-def listen_with_fallback(recognizer=None, microphone=None, prompt: str = "Voice command") -> str:
+def listen_with_fallback(recognizer=None, microphone=None, prompt: str = "Voice command",
+                         audio_buffer: Optional[AudioBuffer] = None) -> str:
     """
     Listen for speech with automatic fallback to text input
     
@@ -111,12 +557,13 @@ def listen_with_fallback(recognizer=None, microphone=None, prompt: str = "Voice
         recognizer: Optional recognizer object
         microphone: Optional microphone object
         prompt: Prompt message for user
+        audio_buffer: Optional preallocated buffer to capture into
         
     Returns:
         User input (from voice or keyboard)
     """
     if recognizer and microphone and SPEECH_RECOGNITION_AVAILABLE:
-        result = listen_for_speech(recognizer, microphone)
+        result = listen_for_speech(recognizer, microphone, audio_buffer=audio_buffer)
         
         if result is not None and result != "":
             return result
@@ -129,6 +576,132 @@ def listen_with_fallback(recognizer=None, microphone=None, prompt: str = "Voice
         print(f"\n💬 {prompt} (type your command):")
         return input("You: ").strip()
 
+def _recognize_phrase(recognizer, audio) -> Optional[Tuple[str, float]]:
+    """
+    Recognize one streamed phrase, on-device when offline or when the speech
+    service fails (like _recognize_audio)
+    
+    Returns:
+        (transcript, confidence), or None if nothing was understood
+    """
+    text = _recognize_offline(audio) if _OFFLINE else None
+    if text is None:
+        try:
+            result = _recognize_google(recognizer, audio, show_all=True)
+        except sr.RequestError as e:
+            logger.error(f"Speech recognition service error: {e}")
+            if _OFFLINE:
+                return None
+            text = _recognize_offline(audio)
+        else:
+            alternatives = result.get('alternative') if isinstance(result, dict) else None
+            if not alternatives:
+                return None
+            return alternatives[0]['transcript'], alternatives[0].get('confidence', 0.8)
+    return (text, 0.8) if text else None
+
+def listen_streaming(recognizer=None, microphone=None, prompt: str = "Voice command",
+                     timeout: int = 10, phrase_time_limit: int = 15,
+                     final_pause: float = 1.5,
+                     audio_buffer: Optional[AudioBuffer] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Listen for speech and yield interim transcripts as each phrase is recognized
+    
+    Phrases are captured on one thread and recognized on another, so speech
+    continues to be recorded while the previous phrase is being recognized.
+    The microphone is released before the final transcript is yielded.
+    
+    Args:
+        recognizer: Optional recognizer object
+        microphone: Optional microphone object
+        prompt: Prompt message for keyboard fallback
+        timeout: Maximum seconds to wait for the first phrase
+        phrase_time_limit: Maximum seconds per recognized phrase
+        final_pause: Seconds without a new phrase before the utterance is final
+        audio_buffer: Optional preallocated buffer to capture into
+        
+    Yields:
+        Dicts with transcription, is_final and confidence. The last event is
+        always final and carries the full utterance.
+    """
+    if not (recognizer and microphone and SPEECH_RECOGNITION_AVAILABLE):
+        print(f"\n💬 {prompt} (type your command):")
+        yield {"transcription": input("You: ").strip(), "is_final": True, "confidence": 0.95}
+        return
+    
+    captured = queue.Queue()  # audio of each phrase, None once capture has stopped
+    phrases = queue.Queue()   # recognition result of each phrase, in order
+    
+    stop = threading.Event()
+    
+    def capture_loop():
+        # Background listener: capture phrases until stopped (each AudioData owns a
+        # copy of its samples, so audio_buffer is free again as soon as it returns)
+        try:
+            with microphone as source:
+                while not stop.is_set():
+                    try:
+                        captured.put(_capture_from_source(recognizer, source, 1, phrase_time_limit, audio_buffer))
+                    except sr.WaitTimeoutError:
+                        continue
+        finally:
+            captured.put(None)
+    
+    def recognize_loop():
+        while (audio := captured.get()) is not None:
+            try:
+                phrases.put(_recognize_phrase(recognizer, audio))
+            except Exception as e:
+                logger.error(f"Unexpected error in speech recognition: {e}")
+                phrases.put(None)
+    
+    _status("[Listening] Listening... (speak now)")
+    capture_thread = threading.Thread(target=capture_loop, daemon=True)
+    recognize_thread = threading.Thread(target=recognize_loop, daemon=True)
+    capture_thread.start()
+    recognize_thread.start()
+    
+    parts, confidences = [], []
+    
+    def add(result: Optional[Tuple[str, float]]) -> bool:
+        if not result:
+            return False
+        parts.append(result[0])
+        confidences.append(result[1])
+        return True
+    
+    wait = timeout
+    try:
+        while True:
+            try:
+                result = phrases.get(timeout=wait)
+            except queue.Empty:
+                break
+            wait = final_pause
+            if add(result):
+                yield {"transcription": " ".join(parts), "is_final": False, "confidence": min(confidences)}
+    finally:
+        # Wait for the microphone to be released (a phrase already being spoken is
+        # finished first) so the next listen can open it
+        stop.set()
+        capture_thread.join()
+        recognize_thread.join()
+    
+    # Phrases that were still being captured or recognized when the pause ended
+    while not phrases.empty():
+        add(phrases.get_nowait())
+    
+    if not parts:
+        # Nothing recognized, offer text input like listen_with_fallback
+        print(f"\n💬 {prompt} (type your command):")
+        yield {"transcription": input("You: ").strip(), "is_final": True, "confidence": 0.95}
+        return
+    
+    text = " ".join(parts)
+    _status(f"[OK] Heard: '{text}'")
+    logger.info(f"Speech recognized: {text}")
+    yield {"transcription": text, "is_final": True, "confidence": min(confidences)}
+
 def test_microphone() -> bool:
     """
     Test microphone setup
@@ -155,69 +728,843 @@ def test_microphone() -> bool:
         return False
 
 # AWS Transcribe integration (for production)
-def transcribe_with_aws(audio_file_path: str) -> Optional[str]:
+_TRANSCRIBE_REGION = 'us-east-1'
+_TRANSCRIBE_LANGUAGE = 'en-US'
+
+# Transcripts of recently transcribed audio, keyed by (content hash, language), LRU with a TTL
+_TRANSCRIPT_CACHE_SIZE = int(os.environ.get('TRANSCRIPT_CACHE_SIZE', '512'))
+_TRANSCRIPT_CACHE_TTL = int(os.environ.get('TRANSCRIPT_CACHE_TTL', '86400'))  # seconds
+_transcript_cache: "OrderedDict[Tuple[str, str], Tuple[float, str]]" = OrderedDict()
+_transcript_cache_lock = threading.Lock()
+
+# Recordings longer than one chunk are split into overlapping chunks transcribed in parallel
+_CHUNK_SECONDS = float(os.environ.get('TRANSCRIBE_CHUNK_SECONDS', '30'))
+_CHUNK_OVERLAP_SECONDS = 1.0
+if _CHUNK_SECONDS <= _CHUNK_OVERLAP_SECONDS:
+    # Consecutive chunks would never advance through the recording
+    raise ValueError(f"TRANSCRIBE_CHUNK_SECONDS must be greater than the "
+                     f"{_CHUNK_OVERLAP_SECONDS:g}s chunk overlap (got {_CHUNK_SECONDS:g})")
+
+# Opt-in 8 kHz 8-bit mu-law uploads (half the bytes of 16-bit PCM); a failed mu-law
+# job is retried as PCM, and a media format rejection turns mu-law off for the process
+_MULAW_UPLOADS = os.environ.get('EMAIL_ASSISTANT_MULAW', 'false').lower() in ('1', 'true')
+_MULAW_SAMPLE_RATE = 8000
+_mulaw_rejected = False
+
+def _transcript_cache_key(audio_file_path: str) -> Tuple[str, str]:
+    """Hash the audio file in 1 MiB chunks so large recordings aren't read into memory at once"""
+    digest = hashlib.sha256()
+    with open(audio_file_path, 'rb') as audio_file:
+        for chunk in iter(lambda: audio_file.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest(), _TRANSCRIBE_LANGUAGE
+
+def _get_cached_transcript(key: Tuple[str, str]) -> Optional[str]:
+    """Return an unexpired cached transcript, refreshing its LRU position"""
+    with _transcript_cache_lock:
+        entry = _transcript_cache.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] > _TRANSCRIPT_CACHE_TTL:
+            del _transcript_cache[key]
+            return None
+        _transcript_cache.move_to_end(key)
+        return entry[1]
+
+def _cache_transcript(key: Tuple[str, str], text: str):
+    """Store a transcript, evicting the least recently used entry when full"""
+    with _transcript_cache_lock:
+        _transcript_cache[key] = (time.monotonic(), text)
+        _transcript_cache.move_to_end(key)
+        while len(_transcript_cache) > _TRANSCRIPT_CACHE_SIZE:
+            _transcript_cache.popitem(last=False)
+
+@lru_cache(maxsize=4)
+def _get_transcribe_clients(region: str = _TRANSCRIBE_REGION) -> Tuple[Any, Any]:
+    """
+    Transcribe and S3 clients, created on first use and reused so later
+    calls skip client setup and keep their pooled connections
+    
+    Args:
+        region: Region of the audio bucket (Transcribe must run there too)
+        
+    Returns:
+        Tuple of (transcribe_client, s3_client)
+    """
+    import boto3
+    from botocore.config import Config
+    
+    config = Config(
+        max_pool_connections=50,
+        retries={'max_attempts': 3, 'mode': 'adaptive'},
+        tcp_keepalive=True
+    )
+    return (
+        boto3.client('transcribe', region_name=region, config=config),
+        boto3.client('s3', region_name=region, config=config)
+    )
+
+# Audio bucket name -> its region, checked (and the bucket created if missing) once per process
+_bucket_regions: Dict[str, str] = {}
+_bucket_regions_lock = threading.Lock()
+
+def _transcribe_bucket_name() -> str:
+    return os.environ.get('TRANSCRIBE_BUCKET', 'email-assistant-transcribe')
+
+def _transcribe_bucket_region(bucket_name: str) -> str:
+    """
+    Region of the audio bucket
+    
+    Uploading to and transcribing in the bucket's own region avoids S3
+    redirects, and Transcribe can only read media from its own region. If the
+    location can't be read (e.g. no s3:GetBucketLocation permission), the
+    configured region is used. The bucket itself is never created here.
+    
+    Args:
+        bucket_name: Name of the audio bucket
+        
+    Returns:
+        Region name
+    """
+    with _bucket_regions_lock:
+        region = _bucket_regions.get(bucket_name)
+        if region is None:
+            from botocore.exceptions import ClientError
+            
+            s3_client = _get_transcribe_clients()[1]
+            try:
+                # us-east-1 buckets report no location constraint
+                location = s3_client.get_bucket_location(Bucket=bucket_name)['LocationConstraint']
+                region = location or 'us-east-1'
+            except ClientError as e:
+                logger.warning(f"Could not look up region of bucket {bucket_name}, "
+                               f"using {_TRANSCRIBE_REGION}: {e}")
+                region = _TRANSCRIBE_REGION
+            _bucket_regions[bucket_name] = region
+        return region
+
+@lru_cache(maxsize=1)
+def _get_transfer_config():
+    """
+    Multipart settings for audio uploads: recordings above the part size
+    are sent as parts over parallel connections
+    """
+    from boto3.s3.transfer import TransferConfig
+    
+    part_size = int(os.environ.get('TRANSCRIBE_UPLOAD_PART_MB', '8')) * 1024 * 1024
+    return TransferConfig(
+        multipart_threshold=part_size,
+        multipart_chunksize=part_size,
+        max_concurrency=int(os.environ.get('TRANSCRIBE_UPLOAD_CONCURRENCY', '10')),
+        use_threads=True
+    )
+
+# One pooled HTTPS session for transcript downloads, so repeat fetches skip the TLS handshake
+_http = requests.Session()
+_http.mount('https://', HTTPAdapter(
+    pool_connections=10, pool_maxsize=10, max_retries=Retry(total=3, backoff_factor=0.2)
+))
+
+def _download_transcript(transcript_uri: str) -> Dict[str, Any]:
+    """Download and parse a finished job's transcript JSON"""
+    transcript_response = _http.get(transcript_uri, timeout=5)
+    transcript_response.raise_for_status()
+    return _json_loads(transcript_response.content)
+
+
+# Job names are unique per process from a counter; the random token drawn once at import
+# keeps processes apart that share a pid (e.g. separate Lambda containers)
+_JOB_TOKEN = uuid.uuid4().hex[:8]
+_JOB_SEQ = itertools.count()
+
+
+def _job_id() -> str:
+    return f"{os.getpid()}-{_JOB_TOKEN}-{next(_JOB_SEQ)}"
+
+
+def _new_transcription_job(name_prefix: str = "transcribe") -> Tuple[str, str, str]:
+    """
+    Name a transcription job and the S3 location of its audio
+    
+    Args:
+        name_prefix: Start of the job name (shared by jobs polled together)
+        
+    Returns:
+        Tuple of (bucket_name, job_name, s3_key)
+    """
+    bucket_name = _transcribe_bucket_name()
+    job_name = f"{name_prefix}-{_job_id()}"
+    return bucket_name, job_name, f"audio/{job_name}.wav"
+
+def _start_job_params(bucket_name: str, job_name: str, s3_key: str) -> Dict[str, Any]:
+    """Arguments for start_transcription_job on an uploaded WAV file"""
+    return {
+        'TranscriptionJobName': job_name,
+        'Media': {'MediaFileUri': f's3://{bucket_name}/{s3_key}'},
+        'MediaFormat': 'wav',
+        'LanguageCode': _TRANSCRIBE_LANGUAGE
+    }
+
+def _wait_for_transcription_job(transcribe_client, job_name: str, initial_delay: float = 0.5,
+                                max_delay: float = 10.0) -> Dict[str, Any]:
+    """
+    Poll a Transcribe job with exponential backoff until it finishes
+    
+    Args:
+        transcribe_client: boto3 Transcribe client
+        job_name: Name of the transcription job
+        initial_delay: Seconds before the second poll
+        max_delay: Cap on the delay between polls
+        
+    Returns:
+        The TranscriptionJob description once it is COMPLETED or FAILED
+    """
+    delay = initial_delay
+    while True:
+        job = transcribe_client.get_transcription_job(TranscriptionJobName=job_name)['TranscriptionJob']
+        if job['TranscriptionJobStatus'] in ('COMPLETED', 'FAILED'):
+            return job
+        time.sleep(delay)
+        delay = min(delay * 2, max_delay)
+
+def _run_transcription_job(audio_file_path: str, mulaw: Optional[bool] = None) -> Optional[Dict[str, Any]]:
+    """
+    Upload one WAV file, transcribe it and download the transcript
+    
+    Args:
+        audio_file_path: Path to audio file
+        mulaw: Upload as mu-law (defaults to EMAIL_ASSISTANT_MULAW)
+        
+    Returns:
+        The transcript's results section, or None if the job failed
+    """
+    with tempfile.TemporaryDirectory() as work_dir:
+        upload_path, mulaw = _prepare_upload(audio_file_path, work_dir, mulaw)
+        
+        # Upload audio to S3 (required by Transcribe)
+        bucket_name, job_name, s3_key = _new_transcription_job()
+        transcribe_client, s3_client = _get_transcribe_clients(_transcribe_bucket_region(bucket_name))
+        s3_client.upload_file(upload_path, bucket_name, s3_key, Config=_get_transfer_config())
+    
+    # Start transcription job and wait for completion
+    transcribe_client.start_transcription_job(**_start_job_params(bucket_name, job_name, s3_key))
+    job = _wait_for_transcription_job(transcribe_client, job_name)
+    
+    if job['TranscriptionJobStatus'] == 'FAILED':
+        if mulaw:
+            _mulaw_job_failed(job)
+            return _run_transcription_job(audio_file_path, mulaw=False)
+        return None
+    
+    # Download and parse transcript
+    return _download_transcript(job['Transcript']['TranscriptFileUri'])['results']
+
+def _downsample_wav(audio_file_path: str, out_dir: str, block_frames: int = 65536) -> str:
+    """
+    Convert a WAV file to 16-bit mono at no more than 16 kHz before it is uploaded
+    
+    Args:
+        audio_file_path: Path to audio file
+        out_dir: Directory for the converted file
+        block_frames: Frames converted per read
+        
+    Returns:
+        Path of the converted file, or audio_file_path if it is already in that
+        format, is not a readable PCM WAV file, or audioop is unavailable
+    """
+    if audioop is None:
+        return audio_file_path
+    try:
+        source = wave.open(audio_file_path, 'rb')
+    except (wave.Error, EOFError):
+        return audio_file_path
+    
+    with source:
+        channels, width, rate = source.getnchannels(), source.getsampwidth(), source.getframerate()
+        out_rate = min(rate, _SPEECH_SAMPLE_RATE)
+        if (channels, width, rate) == (1, _SPEECH_SAMPLE_WIDTH, out_rate):
+            return audio_file_path
+        
+        out_path = os.path.join(out_dir, "speech.wav")
+        with wave.open(out_path, 'wb') as out:
+            out.setnchannels(1)
+            out.setsampwidth(_SPEECH_SAMPLE_WIDTH)
+            out.setframerate(out_rate)
+            state = None
+            while True:
+                frames = source.readframes(block_frames)
+                if not frames:
+                    break
+                if width == 1:
+                    frames = audioop.bias(frames, 1, -128)  # 8-bit WAV samples are unsigned
+                if width != _SPEECH_SAMPLE_WIDTH:
+                    frames = audioop.lin2lin(frames, width, _SPEECH_SAMPLE_WIDTH)
+                if channels == 2:
+                    frames = audioop.tomono(frames, _SPEECH_SAMPLE_WIDTH, 0.5, 0.5)
+                elif channels > 2:
+                    # Keep the first channel
+                    frame_size = channels * _SPEECH_SAMPLE_WIDTH
+                    frames = b"".join(
+                        frames[i:i + _SPEECH_SAMPLE_WIDTH] for i in range(0, len(frames), frame_size)
+                    )
+                if rate != out_rate:
+                    frames, state = audioop.ratecv(frames, _SPEECH_SAMPLE_WIDTH, 1, rate, out_rate, state)
+                out.writeframes(frames)
+    return out_path
+
+def _use_mulaw() -> bool:
+    return _MULAW_UPLOADS and audioop is not None and not _mulaw_rejected
+
+def _mulaw_job_failed(job: Dict[str, Any]):
+    """Log a failed mu-law job, and stop using mu-law if Transcribe rejected the format"""
+    global _mulaw_rejected
+    reason = job.get('FailureReason', '')
+    logger.warning(f"Mu-law transcription job failed ({reason}), retrying as PCM")
+    if 'format' in reason.lower():
+        _mulaw_rejected = True
+
+def _encode_mulaw_wav(audio_file_path: str, out_dir: str, block_frames: int = 65536) -> str:
+    """
+    Re-encode a 16-bit mono WAV file as 8 kHz mu-law for upload
+    
+    The wave module only writes PCM, so the header (format tag 7) is written here.
+    
+    Args:
+        audio_file_path: Path to audio file
+        out_dir: Directory for the encoded file
+        block_frames: Frames encoded per read
+        
+    Returns:
+        Path of the mu-law file, or audio_file_path if it is not 16-bit mono PCM
+    """
+    try:
+        source = wave.open(audio_file_path, 'rb')
+    except (wave.Error, EOFError):
+        return audio_file_path
+    
+    with source:
+        rate = source.getframerate()
+        if (source.getnchannels(), source.getsampwidth()) != (1, _SPEECH_SAMPLE_WIDTH):
+            return audio_file_path
+        
+        out_path = os.path.join(out_dir, "speech-mulaw.wav")
+        with open(out_path, 'wb') as out:
+            out.write(bytes(58))  # header, filled in once the data length is known
+            data_length = 0
+            state = None
+            while True:
+                frames = source.readframes(block_frames)
+                if not frames:
+                    break
+                if rate != _MULAW_SAMPLE_RATE:
+                    frames, state = audioop.ratecv(frames, _SPEECH_SAMPLE_WIDTH, 1, rate, _MULAW_SAMPLE_RATE, state)
+                frames = audioop.lin2ulaw(frames, _SPEECH_SAMPLE_WIDTH)
+                out.write(frames)
+                data_length += len(frames)
+            if data_length % 2:
+                out.write(b'\0')  # RIFF chunks are word aligned
+            
+            out.seek(0)
+            out.write(b'RIFF' + struct.pack('<I', 50 + data_length + data_length % 2) + b'WAVE')
+            out.write(b'fmt ' + struct.pack('<IHHIIHHH', 18, 7, 1, _MULAW_SAMPLE_RATE, _MULAW_SAMPLE_RATE, 1, 8, 0))
+            out.write(b'fact' + struct.pack('<II', 4, data_length))
+            out.write(b'data' + struct.pack('<I', data_length))
+    return out_path
+
+def _prepare_upload(audio_file_path: str, work_dir: str, mulaw: Optional[bool] = None) -> Tuple[str, bool]:
+    """
+    File to upload for one transcription job
+    
+    Args:
+        audio_file_path: Path to a (downsampled) WAV file or chunk
+        work_dir: Directory for an encoded copy
+        mulaw: Encode as mu-law (defaults to EMAIL_ASSISTANT_MULAW)
+        
+    Returns:
+        Tuple of (upload path, whether it is mu-law encoded)
+    """
+    if mulaw is None:
+        mulaw = _use_mulaw()
+    upload_path = _encode_mulaw_wav(audio_file_path, work_dir) if mulaw else audio_file_path
+    return upload_path, upload_path != audio_file_path
+
+def _wav_seconds(audio_file_path: str) -> float:
+    """Duration of a WAV file in seconds, or 0.0 if it is not a readable WAV file"""
+    try:
+        with wave.open(audio_file_path, 'rb') as source:
+            return source.getnframes() / source.getframerate()
+    except (wave.Error, EOFError):
+        return 0.0
+
+def _split_wav(audio_file_path: str, chunk_dir: str, chunk_seconds: float = _CHUNK_SECONDS,
+               overlap_seconds: float = _CHUNK_OVERLAP_SECONDS) -> List[Tuple[str, float, float]]:
+    """
+    Write a long WAV file out as overlapping chunk files
+    
+    Each chunk keeps the words starting in its share of the overlaps (half of
+    each), so consecutive chunks stitch together without repeating words.
+    
+    Args:
+        audio_file_path: Path to audio file
+        chunk_dir: Directory for the chunk files
+        chunk_seconds: Length of each chunk
+        overlap_seconds: Audio shared by consecutive chunks
+        
+    Returns:
+        (chunk path, keep_from, keep_to) in order, with the bounds in seconds
+        relative to the chunk; empty if the audio fits in one chunk or is not
+        a readable WAV file
+    """
+    try:
+        source = wave.open(audio_file_path, 'rb')
+    except (wave.Error, EOFError):
+        return []
+    
+    with source:
+        params = source.getparams()
+        frame_rate = params.framerate
+        if params.nframes <= chunk_seconds * frame_rate:
+            return []
+        
+        chunk_frames = int(chunk_seconds * frame_rate)
+        step_frames = chunk_frames - int(overlap_seconds * frame_rate)
+        half_overlap = overlap_seconds / 2
+        chunks = []
+        start = 0
+        while True:
+            is_last = start + chunk_frames >= params.nframes
+            source.setpos(start)
+            chunk_path = os.path.join(chunk_dir, f"chunk-{len(chunks)}.wav")
+            with wave.open(chunk_path, 'wb') as chunk:
+                chunk.setparams(params)
+                chunk.writeframes(source.readframes(chunk_frames))
+            chunks.append((
+                chunk_path,
+                half_overlap if chunks else 0.0,
+                float('inf') if is_last else chunk_seconds - half_overlap
+            ))
+            if is_last:
+                return chunks
+            start += step_frames
+
+def _chunk_text(results: Dict[str, Any], keep_from: float, keep_to: float) -> str:
+    """
+    Text of the words in one chunk's transcript that start within [keep_from, keep_to)
+    
+    Args:
+        results: Transcript results section for the chunk
+        keep_from: Chunk-relative second the chunk's share starts at
+        keep_to: Chunk-relative second the chunk's share ends at
+        
+    Returns:
+        Transcript text for the chunk's share of the audio
+    """
+    items = results.get('items')
+    if not items:
+        return results['transcripts'][0]['transcript']
+    
+    words = []
+    keeping = False
+    for item in items:
+        content = item['alternatives'][0]['content']
+        if item['type'] == 'punctuation':
+            # Punctuation has no timing; it follows the word before it
+            if keeping and words:
+                words[-1] += content
+            continue
+        keeping = keep_from <= float(item['start_time']) < keep_to
+        if keeping:
+            words.append(content)
+    return " ".join(words)
+
+def _join_chunk_results(chunk_results: List[Dict[str, Any]], chunks: List[Tuple[str, float, float]]) -> str:
+    """
+    Transcript text from the results of every job
+    
+    Args:
+        chunk_results: Results section of each job, in order
+        chunks: _split_wav output (empty when the audio was one job)
+        
+    Returns:
+        Transcript text
+    """
+    if not chunks:
+        return chunk_results[0]['transcripts'][0]['transcript']
+    return " ".join(filter(None, (
+        _chunk_text(results, keep_from, keep_to)
+        for results, (_, keep_from, keep_to) in zip(chunk_results, chunks)
+    )))
+
+async def _wait_for_transcription_job_async(transcribe_client, job_name: str, initial_delay: float = 0.5,
+                                            max_delay: float = 10.0) -> Dict[str, Any]:
+    """Awaitable _wait_for_transcription_job for an aioboto3 Transcribe client"""
+    delay = initial_delay
+    while True:
+        job = (await transcribe_client.get_transcription_job(TranscriptionJobName=job_name))['TranscriptionJob']
+        if job['TranscriptionJobStatus'] in ('COMPLETED', 'FAILED'):
+            return job
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, max_delay)
+
+async def _run_transcription_job_async(transcribe_client, s3_client, audio_file_path: str,
+                                      mulaw: Optional[bool] = None) -> Optional[Dict[str, Any]]:
+    """Awaitable _run_transcription_job on aioboto3 clients"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        upload_path, mulaw = await asyncio.to_thread(_prepare_upload, audio_file_path, work_dir, mulaw)
+        
+        # Upload audio to S3 (required by Transcribe)
+        bucket_name, job_name, s3_key = _new_transcription_job()
+        await s3_client.upload_file(upload_path, bucket_name, s3_key, Config=_get_transfer_config())
+    
+    # Start transcription job and wait for completion
+    await transcribe_client.start_transcription_job(**_start_job_params(bucket_name, job_name, s3_key))
+    job = await _wait_for_transcription_job_async(transcribe_client, job_name)
+    
+    if job['TranscriptionJobStatus'] == 'FAILED':
+        if mulaw:
+            _mulaw_job_failed(job)
+            return await _run_transcription_job_async(transcribe_client, s3_client, audio_file_path, mulaw=False)
+        return None
+    
+    # Download and parse transcript
+    return (await asyncio.to_thread(_download_transcript, job['Transcript']['TranscriptFileUri']))['results']
+
+def transcribe_with_aws(audio_file_path: str, max_parallel_chunks: int = 8) -> Optional[str]:
     """
     Transcribe audio using AWS Transcribe (production)
     
+    Recordings longer than TRANSCRIBE_CHUNK_SECONDS are split into overlapping
+    chunks that are transcribed as parallel jobs and stitched back in order.
+    
     Args:
         audio_file_path: Path to audio file
+        max_parallel_chunks: Maximum chunk jobs running at once
         
     Returns:
         Transcribed text or None
     """
     try:
-        import boto3
-        import time
-        import uuid
+        # Identical audio was transcribed recently: skip the upload and job
+        cache_key = _transcript_cache_key(audio_file_path)
+        text = _get_cached_transcript(cache_key)
+        if text is not None:
+            _status(f"[SUCCESS] Cached transcript: '{text}'")
+            return text
         
-        # Initialize AWS clients
-        transcribe_client = boto3.client('transcribe', region_name='us-east-1')
-        s3_client = boto3.client('s3', region_name='us-east-1')
+        _status("[Processing] AWS Transcribe processing...")
+        with tempfile.TemporaryDirectory() as chunk_dir:
+            upload_path = _downsample_wav(audio_file_path, chunk_dir)
+            chunks = _split_wav(upload_path, chunk_dir)
+            if chunks:
+                with ThreadPoolExecutor(max_workers=min(max_parallel_chunks, len(chunks))) as executor:
+                    chunk_results = list(executor.map(_run_transcription_job, [chunk[0] for chunk in chunks]))
+            else:
+                chunk_results = [_run_transcription_job(upload_path)]
         
-        # Upload audio to S3 (required by Transcribe)
-        bucket_name = os.environ.get('TRANSCRIBE_BUCKET', 'email-assistant-transcribe')
-        job_name = f"transcribe-{uuid.uuid4()}"
-        s3_key = f"audio/{job_name}.wav"
-        
-        s3_client.upload_file(audio_file_path, bucket_name, s3_key)
-        
-        # Start transcription job
-        transcribe_client.start_transcription_job(
-            TranscriptionJobName=job_name,
-            Media={'MediaFileUri': f's3://{bucket_name}/{s3_key}'},
-            MediaFormat='wav',
-            LanguageCode='en-US'
-        )
+        if any(results is None for results in chunk_results):
+            _status("[ERROR] AWS Transcribe failed")
+            logger.error("AWS Transcribe job failed")
+            return None
         
-        # Wait for completion
-        print("[Processing] AWS Transcribe processing...")
-        while True:
-            status = transcribe_client.get_transcription_job(TranscriptionJobName=job_name)
-            job_status = status['TranscriptionJob']['TranscriptionJobStatus']
-            
-            if job_status == 'COMPLETED':
-                transcript_uri = status['TranscriptionJob']['Transcript']['TranscriptFileUri']
-                
-                # Download and parse transcript
-                import requests
-                transcript_response = requests.get(transcript_uri)
-                transcript_data = transcript_response.json()
-                
-                text = transcript_data['results']['transcripts'][0]['transcript']
-                print(f"[SUCCESS] AWS Transcribe result: '{text}'")
-                return text
+        text = _join_chunk_results(chunk_results, chunks)
+        _cache_transcript(cache_key, text)
+        _status(f"[SUCCESS] AWS Transcribe result: '{text}'")
+        return text
+        
+    except Exception as e:
+        logger.error(f"AWS Transcribe error: {e}")
+        _status(f"[ERROR] AWS Transcribe error: {e}")
+        return None
+
+async def transcribe_with_aws_async(audio_file_path: str, max_parallel_chunks: int = 8) -> Optional[str]:
+    """
+    Transcribe audio using AWS Transcribe without blocking the event loop
+    
+    Same flow as transcribe_with_aws (downsampling, chunking, optional mu-law
+    uploads), on aioboto3 clients; file work and the transcript download run
+    in worker threads.
+    
+    Args:
+        audio_file_path: Path to audio file
+        max_parallel_chunks: Maximum chunk jobs running at once
+        
+    Returns:
+        Transcribed text or None
+    """
+    try:
+        # Identical audio was transcribed recently: skip the upload and job
+        cache_key = await asyncio.to_thread(_transcript_cache_key, audio_file_path)
+        text = _get_cached_transcript(cache_key)
+        if text is not None:
+            _status(f"[SUCCESS] Cached transcript: '{text}'")
+            return text
+        
+        import aioboto3
+        
+        region = await asyncio.to_thread(_transcribe_bucket_region, _transcribe_bucket_name())
+        
+        _status("[Processing] AWS Transcribe processing...")
+        session = aioboto3.Session()
+        async with session.client('transcribe', region_name=region) as transcribe_client, \
+                session.client('s3', region_name=region) as s3_client:
+            with tempfile.TemporaryDirectory() as chunk_dir:
+                upload_path = await asyncio.to_thread(_downsample_wav, audio_file_path, chunk_dir)
+                chunks = await asyncio.to_thread(_split_wav, upload_path, chunk_dir)
+                limit = asyncio.Semaphore(max_parallel_chunks)
                 
-            elif job_status == 'FAILED':
-                print("[ERROR] AWS Transcribe failed")
-                return None
+                async def run(path: str) -> Optional[Dict[str, Any]]:
+                    async with limit:
+                        return await _run_transcription_job_async(transcribe_client, s3_client, path)
                 
-            time.sleep(2)
-            
+                chunk_results = await asyncio.gather(*(run(path) for path in [chunk[0] for chunk in chunks] or [upload_path]))
+        
+        if any(results is None for results in chunk_results):
+            _status("[ERROR] AWS Transcribe failed")
+            logger.error("AWS Transcribe job failed")
+            return None
+        
+        text = _join_chunk_results(chunk_results, chunks)
+        _cache_transcript(cache_key, text)
+        _status(f"[SUCCESS] AWS Transcribe result: '{text}'")
+        return text
+        
     except Exception as e:
         logger.error(f"AWS Transcribe error: {e}")
-        print(f"[ERROR] AWS Transcribe error: {e}")
+        _status(f"[ERROR] AWS Transcribe error: {e}")
+        return None
+
+def _set_future_result(future: asyncio.Future, result: Optional[str]):
+    """Resolve a caller's future unless the caller has already given up on it"""
+    if not future.done():
+        future.set_result(result)
+
+async def microphone_pcm_chunks(source, max_seconds: float = 15, chunk_ms: int = 20) -> AsyncIterator[bytes]:
+    """
+    Read raw PCM from an open microphone in chunk_ms pieces
+    
+    Args:
+        source: Microphone that is already open (inside its context manager)
+        max_seconds: How long to record
+        chunk_ms: Length of each chunk
+        
+    Yields:
+        PCM chunks as captured
+    """
+    frames_per_chunk = source.SAMPLE_RATE * chunk_ms // 1000
+    for _ in range(int(max_seconds * 1000 // chunk_ms)):
+        yield await asyncio.to_thread(source.stream.read, frames_per_chunk)
+
+async def transcribe_stream_aws(audio_chunks: AsyncIterator[bytes], sample_rate: int = 16000,
+                                on_partial: Optional[Callable[[str], None]] = None) -> Optional[str]:
+    """
+    Transcribe audio with AWS Transcribe streaming as it is captured
+    
+    Results arrive while audio is still being sent, so there is no S3 upload
+    or job polling; use transcribe_with_aws for recorded files.
+    
+    Args:
+        audio_chunks: 16-bit mono PCM chunks (e.g. from microphone_pcm_chunks)
+        sample_rate: Sample rate of the PCM audio
+        on_partial: Optional callback receiving the interim transcript
+        
+    Returns:
+        Transcribed text or None
+    """
+    if not TRANSCRIBE_STREAMING_AVAILABLE:
+        logger.warning("amazon-transcribe not installed, streaming transcription unavailable")
+        return None
+    
+    try:
+        client = TranscribeStreamingClient(region=_TRANSCRIBE_REGION)
+        stream = await client.start_stream_transcription(
+            language_code=_TRANSCRIBE_LANGUAGE,
+            media_sample_rate_hz=sample_rate,
+            media_encoding='pcm'
+        )
+        
+        async def send_audio():
+            async for chunk in audio_chunks:
+                await stream.input_stream.send_audio_event(audio_chunk=chunk)
+            await stream.input_stream.end_stream()
+        
+        collector = _TranscriptCollector(stream.output_stream, on_partial)
+        await asyncio.gather(send_audio(), collector.handle_events())
+        
+        text = " ".join(collector.segments)
+        _status(f"[SUCCESS] AWS Transcribe result: '{text}'")
+        return text
+        
+    except Exception as e:
+        logger.error(f"AWS Transcribe streaming error: {e}")
+        _status(f"[ERROR] AWS Transcribe streaming error: {e}")
         return None
 
+class TranscribeBatcher:
+    """
+    Transcribes audio for concurrent callers in batches.
+    Requests arriving within max_wait of each other are uploaded and started
+    together, and each batch is polled with one ListTranscriptionJobs call per
+    round instead of one GetTranscriptionJob call per job.
+    Uploads are prepared like transcribe_with_aws (downsampled, mu-law when
+    enabled, retried as PCM); recordings longer than one chunk skip the batch
+    and go to transcribe_with_aws_async to be split into parallel jobs.
+    """
+    
+    def __init__(self, max_batch: int = 16, max_wait: float = 0.5):
+        self.max_batch = min(max_batch, 100)  # jobs listed in one ListTranscriptionJobs page
+        self.max_wait = max_wait
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._batches = set()
+    
+    async def transcribe(self, audio_file_path: str) -> Optional[str]:
+        """
+        Transcribe one file as part of the next batch
+        
+        Args:
+            audio_file_path: Path to audio file
+            
+        Returns:
+            Transcribed text or None
+        """
+        cache_key = await asyncio.to_thread(_transcript_cache_key, audio_file_path)
+        text = _get_cached_transcript(cache_key)
+        if text is not None:
+            return text
+        
+        if await asyncio.to_thread(_wav_seconds, audio_file_path) > _CHUNK_SECONDS:
+            return await transcribe_with_aws_async(audio_file_path)
+        
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((audio_file_path, cache_key, future))
+        return await future
+    
+    async def close(self):
+        """
+        Stop collecting batches, let the batches in flight finish, then close the
+        AWS clients; requests still waiting in the queue fail with RuntimeError
+        """
+        if self._worker is not None:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+            while not self._queue.empty():
+                future = self._queue.get_nowait()[2]
+                if not future.done():
+                    future.set_exception(RuntimeError("TranscribeBatcher closed"))
+    
+    async def _run(self):
+        try:
+            await self._collect_batches()
+        except Exception as e:
+            # Fail whatever is queued; the next transcribe() starts a fresh worker
+            logger.error(f"AWS Transcribe error: {e}")
+            while not self._queue.empty():
+                _set_future_result(self._queue.get_nowait()[2], None)
+            self._worker = None
+    
+    async def _collect_batches(self):
+        # Collect up to max_batch requests, waiting at most max_wait after the first
+        import aioboto3
+        
+        region = await asyncio.to_thread(_transcribe_bucket_region, _transcribe_bucket_name())
+        session = aioboto3.Session()
+        async with session.client('transcribe', region_name=region) as transcribe_client, \
+                session.client('s3', region_name=region) as s3_client:
+            loop = asyncio.get_running_loop()
+            try:
+                while True:
+                    batch = [await self._queue.get()]
+                    deadline = loop.time() + self.max_wait
+                    try:
+                        while len(batch) < self.max_batch:
+                            try:
+                                batch.append(await asyncio.wait_for(self._queue.get(), deadline - loop.time()))
+                            except asyncio.TimeoutError:
+                                break
+                    except asyncio.CancelledError:
+                        # Closed mid-collection: these requests were already taken off the queue
+                        for _, _, future in batch:
+                            if not future.done():
+                                future.set_exception(RuntimeError("TranscribeBatcher closed"))
+                        raise
+                    
+                    # Poll this batch while the next one is collected
+                    task = asyncio.create_task(self._process_batch(batch, transcribe_client, s3_client))
+                    self._batches.add(task)
+                    task.add_done_callback(self._batches.discard)
+            finally:
+                # The clients close when this block exits; batches still using them finish first
+                if self._batches:
+                    await asyncio.gather(*self._batches, return_exceptions=True)
+    
+    async def _process_batch(self, batch: List[Tuple[str, Tuple[str, str], asyncio.Future]],
+                             transcribe_client, s3_client):
+        batch_prefix = f"transcribe-batch-{_job_id()}"
+        
+        pending = {}
+        
+        async def start(audio_file_path: str, cache_key: Tuple[str, str], future: asyncio.Future,
+                        mulaw: Optional[bool] = None):
+            bucket_name, job_name, s3_key = _new_transcription_job(batch_prefix)
+            try:
+                with tempfile.TemporaryDirectory() as work_dir:
+                    upload_path = await asyncio.to_thread(_downsample_wav, audio_file_path, work_dir)
+                    upload_path, mulaw = await asyncio.to_thread(_prepare_upload, upload_path, work_dir, mulaw)
+                    await s3_client.upload_file(upload_path, bucket_name, s3_key, Config=_get_transfer_config())
+                await transcribe_client.start_transcription_job(**_start_job_params(bucket_name, job_name, s3_key))
+            except Exception as e:
+                logger.error(f"AWS Transcribe error: {e}")
+                _set_future_result(future, None)
+            else:
+                pending[job_name] = (audio_file_path, cache_key, future, mulaw)
+        
+        await asyncio.gather(*(start(path, cache_key, future) for path, cache_key, future in batch))
+        
+        delay = 0.5
+        while pending:
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 10.0)
+            try:
+                listing = await transcribe_client.list_transcription_jobs(
+                    JobNameContains=f"{batch_prefix}-", MaxResults=100
+                )
+                finished = [
+                    summary for summary in listing['TranscriptionJobSummaries']
+                    if summary['TranscriptionJobName'] in pending
+                    and summary['TranscriptionJobStatus'] in ('COMPLETED', 'FAILED')
+                ]
+                for summary in finished:
+                    audio_file_path, cache_key, future, mulaw = pending.pop(summary['TranscriptionJobName'])
+                    if summary['TranscriptionJobStatus'] == 'FAILED' and mulaw:
+                        # Same batch prefix, so the PCM retry is picked up by the next listing
+                        _mulaw_job_failed(summary)
+                        await start(audio_file_path, cache_key, future, mulaw=False)
+                        continue
+                    _set_future_result(future, (
+                        await self._fetch_transcript(transcribe_client, summary, cache_key)
+                        if summary['TranscriptionJobStatus'] == 'COMPLETED' else None
+                    ))
+            except Exception as e:
+                logger.error(f"AWS Transcribe error: {e}")
+                for _, _, future, _ in pending.values():
+                    _set_future_result(future, None)
+                return
+    
+    async def _fetch_transcript(self, transcribe_client, summary: Dict[str, Any],
+                                cache_key: Tuple[str, str]) -> str:
+        # Job summaries don't carry the transcript location
+        job = (await transcribe_client.get_transcription_job(
+            TranscriptionJobName=summary['TranscriptionJobName']
+        ))['TranscriptionJob']
+        transcript_data = await asyncio.to_thread(_download_transcript, job['Transcript']['TranscriptFileUri'])
+        text = transcript_data['results']['transcripts'][0]['transcript']
+        _cache_transcript(cache_key, text)
+        return text
+
 if __name__ == "__main__":
     # Run microphone test
     print("="*60)